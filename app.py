@@ -1,6 +1,5 @@
 import streamlit as st
 from components.data_dashboard import render_data_dashboard
-from components.sentiment_dashboard import render_sentiment_dashboard
 import time
 
 st.set_page_config(
@@ -23,16 +22,16 @@ def main():
         render_data_dashboard()
     
     with tab2:
-        render_sentiment_dashboard()
+        # Only import and render the sentiment dashboard once the user asks for it
+        if st.session_state.get("sentiment_tab_loaded") or st.checkbox("Load sentiment analysis", value=False, key="load_sentiment_tab"):
+            st.session_state.sentiment_tab_loaded = True
+            from components.sentiment_dashboard import render_sentiment_dashboard
+            render_sentiment_dashboard()
     
     # Footer
     st.markdown("---")
-    st.markdown("""
-    <div style="text-align: center;">
-        <p>Data sourced from Yahoo Finance. Sentiment analysis from various public sources.</p>
-        <p>© 2023 Stock Market Dashboard</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.caption("Data sourced from Yahoo Finance. Sentiment analysis from various public sources.")
+    st.caption("© 2023 Stock Market Dashboard")
 
 if __name__ == "__main__":
     main()
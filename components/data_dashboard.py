@@ -1,38 +1,42 @@
 import streamlit as st
 import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
+import hashlib
 from utils.stock_data import (
     get_stock_data, 
+    get_stock_data_multi,
     get_stock_info, 
     search_stocks, 
     format_ticker, 
-    map_period_to_delta,
+    downsample_ohlc,
+    compact_chart_data,
     get_comparable_stocks
 )
 
 # Default tickers for different markets
 DEFAULT_TICKERS = {
-    "India (NSE)": [
+    "India (NSE)": (
         "RELIANCE.NS", "TCS.NS", "HDFCBANK.NS", "INFY.NS", "ICICIBANK.NS", 
         "HDFC.NS", "HINDUNILVR.NS", "SBIN.NS", "BAJFINANCE.NS", "KOTAKBANK.NS"
-    ],
-    "India (BSE)": [
+    ),
+    "India (BSE)": (
         "RELIANCE.BO", "TCS.BO", "HDFCBANK.BO", "INFY.BO", "ICICIBANK.BO", 
         "HDFC.BO", "HINDUNILVR.BO", "SBIN.BO", "BAJFINANCE.BO", "KOTAKBANK.BO"
-    ],
-    "US": [
+    ),
+    "US": (
         "AAPL", "MSFT", "AMZN", "GOOGL", "META", 
         "TSLA", "NVDA", "BRK-B", "JPM", "JNJ"
-    ],
-    "Indices": [
+    ),
+    "Indices": (
         "^NSEI", "^BSESN", "^GSPC", "^DJI", "^IXIC", 
         "^FTSE", "^N225", "^HSI", "^GDAXI", "^FCHI"
-    ]
+    )
 }
 
+MARKETS = tuple(DEFAULT_TICKERS.keys())
+
 # Define time periods available
 TIME_PERIODS = {
     "1D": {"period": "1d", "interval": "5m"},
@@ -45,8 +49,10 @@ TIME_PERIODS = {
     "MAX": {"period": "max", "interval": "1mo"}
 }
 
+PERIOD_KEYS = tuple(TIME_PERIODS.keys())
+
 # Define chart types
-CHART_TYPES = ["Candlestick", "Line", "OHLC", "Area"]
+CHART_TYPES = ("Candlestick", "Line", "OHLC", "Area")
 
 def render_data_dashboard():
     """Renders the stock data dashboard"""
@@ -60,7 +66,7 @@ def render_data_dashboard():
         # Market selection
         market = st.selectbox(
             "Select Market", 
-            list(DEFAULT_TICKERS.keys()),
+            MARKETS,
             index=0,
             key="market_select"
         )
@@ -73,34 +79,28 @@ def render_data_dashboard():
             key="ticker_select"
         )
         
-        # Custom ticker input
-        custom_ticker = st.text_input(
-            "Or enter custom ticker symbol", 
-            value="",
-            help="For NSE stocks, add .NS suffix (e.g., RELIANCE.NS). For BSE stocks, add .BO suffix."
-        )
+        # Custom ticker input (inside a form so the value only updates on submit, not while typing)
+        with st.form("custom_ticker_form", clear_on_submit=False):
+            custom_ticker = st.text_input(
+                "Or enter custom ticker symbol", 
+                value="",
+                help="For NSE stocks, add .NS suffix (e.g., RELIANCE.NS). For BSE stocks, add .BO suffix."
+            )
+            st.form_submit_button("Load")
         
-        if custom_ticker:
-            selected_ticker = custom_ticker
+        if custom_ticker.strip():
+            selected_ticker = custom_ticker.strip().upper()
             
         # Time period selection
         period_key = st.selectbox(
             "Select Time Period", 
-            list(TIME_PERIODS.keys()),
+            PERIOD_KEYS,
             index=2,  # Default to 1M
             key="period_select"
         )
         
         period_config = TIME_PERIODS[period_key]
         
-        # Chart type selection
-        chart_type = st.selectbox(
-            "Select Chart Type", 
-            CHART_TYPES,
-            index=0,
-            key="chart_type_select"
-        )
-        
         # Get stock data and info
         with st.spinner("Fetching stock data..."):
             data, error = get_stock_data(
@@ -142,11 +142,6 @@ def render_data_dashboard():
                 overflow-wrap: break-word !important;
                 font-size: 1.4rem !important;
             }
-            .compact-info {
-                font-size: 0.9rem;
-                margin-top: 5px;
-                margin-bottom: 15px;
-            }
             </style>
             """, unsafe_allow_html=True)
             
@@ -189,157 +184,284 @@ def render_data_dashboard():
             st.markdown("</div>", unsafe_allow_html=True)
             
             # Use more compact display for additional information
-            st.markdown(
-                f"<div class='compact-info'>Exchange: <b>{info.get('exchange', 'N/A')}</b> | Sector: <b>{info.get('sector', 'N/A')}</b></div>", 
-                unsafe_allow_html=True
+            exchange_col, sector_col = st.columns(2)
+            exchange_col.caption(f"Exchange: **{info.get('exchange', 'N/A')}**")
+            sector_col.caption(f"Sector: **{info.get('sector', 'N/A')}**")
+                
+    with col2:
+        # Main chart area
+        _render_chart(data, info, selected_ticker, period_key, period_config)
+
+@st.fragment
+def _render_chart(data, info, selected_ticker, period_key, period_config):
+    """
+    Renders the chart controls and the price and volume charts for the selected stock
+    
+    The chart type and comparison widgets live inside the fragment, so changing them reruns
+    only the chart area instead of the whole page.
+    """
+    if data is not None and not data.empty:
+        st.subheader(f"{info.get('name', selected_ticker)} Stock Chart")
+
+        type_col, compare_col = st.columns([1, 2])
+
+        # Chart type selection
+        with type_col:
+            chart_type = st.selectbox(
+                "Select Chart Type", 
+                CHART_TYPES,
+                index=0,
+                key="chart_type_select"
             )
-            
-            # Comparison section
-            st.subheader("Compare with")
-            comparable_stocks, comp_error = get_comparable_stocks(selected_ticker)
-            
+
+        # Comparison section
+        compare_with = []
+        with compare_col:
+            comparable_stocks, comp_error = get_comparable_stocks(selected_ticker) if info else ([], None)
+
             if comp_error:
                 st.warning(comp_error)
-            
+
             if comparable_stocks:
                 compare_with = st.multiselect(
-                    "Select stocks to compare", 
+                    "Compare with", 
                     comparable_stocks,
                     default=[comparable_stocks[0]] if comparable_stocks else [],
                     key="compare_select"
                 )
-                
-    with col2:
-        # Main chart area
-        if data is not None and not data.empty:
-            st.subheader(f"{info.get('name', selected_ticker)} Stock Chart")
-            
-            # Get the last price and calculate change
-            last_close = data['Close'].iloc[-1]
-            prev_close = data['Close'].iloc[-2] if len(data) > 1 else data['Close'].iloc[0]
-            price_change = last_close - prev_close
-            price_change_pct = (price_change / prev_close) * 100 if prev_close != 0 else 0
-            
-            # Display current price and change
-            price_col, change_col, _, vol_col = st.columns([1, 1, 1, 1])
-            
-            with price_col:
-                st.metric(
-                    "Current Price", 
-                    f"{last_close:.2f} {info.get('currency', '')}",
-                )
-                
-            with change_col:
-                st.metric(
-                    "Change", 
-                    f"{price_change:.2f} ({price_change_pct:.2f}%)",
-                    delta=price_change
+
+        # Get the last price
+        closes = data['Close'].to_numpy(copy=False)
+        last_close, prev_close = closes[-1], closes[-2 if closes.size > 1 else 0]
+
+        # Indices report zero or missing volume, so only show volume when some bar has any
+        volume = data['Volume'] if 'Volume' in data.columns else None
+        has_volume = volume is not None and bool(volume.fillna(0).gt(0).any())
+        last_volume = volume.iloc[-1] if has_volume else None
+
+        # Display current price and change
+        _render_price_metrics(
+            float(last_close),
+            float(prev_close),
+            info.get('currency', ''),
+            float(last_volume) if pd.notna(last_volume) else None
+        )
+
+        # Reuse the figures from the previous run if nothing affecting them changed (the last
+        # bar's values are part of the key since intraday bars are revised in place)
+        chart_key = (
+            selected_ticker, period_key, chart_type, tuple(compare_with),
+            len(data), data.index[-1], tuple(data.iloc[-1].tolist())
+        )
+        if st.session_state.get("last_chart_key") == chart_key and "last_chart_figs" in st.session_state:
+            fig, volume_fig, comp_warnings = st.session_state.last_chart_figs
+
+            # Show the comparison warnings from the run that built the figures again
+            for message in comp_warnings:
+                st.warning(message)
+        else:
+            # Cap the number of points and shrink the dtypes pushed to the browser
+            data = compact_chart_data(downsample_ohlc(data))
+
+            # Collect comparison stocks if selected
+            comparisons = {}
+            comp_warnings = []
+            if compare_with:
+                # Fetch all comparison stocks with a single batched request
+                comp_results, comp_error = get_stock_data_multi(
+                    tuple(compare_with),
+                    period=period_config["period"],
+                    interval=period_config["interval"]
                 )
-                
-            with vol_col:
-                if 'Volume' in data.columns:
-                    last_volume = data['Volume'].iloc[-1]
-                    vol_str = f"{last_volume:,.0f}"
-                    st.metric("Volume", vol_str)
-            
-            # Create figure
-            fig = None
-            
-            if chart_type == "Candlestick":
-                fig = go.Figure(data=[go.Candlestick(
-                    x=data.index,
-                    open=data['Open'],
-                    high=data['High'],
-                    low=data['Low'],
-                    close=data['Close'],
-                    name=selected_ticker
-                )])
-            elif chart_type == "Line":
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=data.index, 
-                    y=data['Close'],
-                    mode='lines',
-                    name=selected_ticker
-                ))
-            elif chart_type == "OHLC":
-                fig = go.Figure(data=[go.Ohlc(
-                    x=data.index,
-                    open=data['Open'],
-                    high=data['High'],
-                    low=data['Low'],
-                    close=data['Close'],
-                    name=selected_ticker
-                )])
-            elif chart_type == "Area":
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=data.index, 
-                    y=data['Close'],
-                    fill='tozeroy',
-                    name=selected_ticker
-                ))
-                
-            # Add comparison stocks if selected
-            if 'compare_with' in locals() and compare_with:
+
                 for comp_ticker in compare_with:
-                    comp_data, comp_error = get_stock_data(
-                        comp_ticker,
-                        period=period_config["period"],
-                        interval=period_config["interval"]
-                    )
-                    
-                    if comp_error or comp_data is None or comp_data.empty:
-                        st.warning(f"Could not fetch data for {comp_ticker}: {comp_error}")
+                    comp_data = comp_results.get(comp_ticker)
+
+                    if comp_data is None or comp_data.empty:
+                        message = f"Could not fetch data for {comp_ticker}: {comp_error or 'No data found for this ticker.'}"
+                        comp_warnings.append(message)
+                        st.warning(message)
                         continue
-                        
+
                     if chart_type == "Line" or chart_type == "Area":
-                        # Normalize data for comparison (first value = 100)
-                        base_value = comp_data['Close'].iloc[0]
-                        normalized_data = (comp_data['Close'] / base_value) * 100
-                        
-                        fig.add_trace(go.Scatter(
-                            x=comp_data.index,
-                            y=normalized_data,
-                            mode='lines',
-                            name=comp_ticker
-                        ))
-            
-            # Update layout
-            fig.update_layout(
-                title=f"{info.get('name', selected_ticker)} - {period_key} Chart",
-                xaxis_title="Date",
-                yaxis_title=f"Price ({info.get('currency', '')})",
-                height=600,
-                xaxis_rangeslider_visible=False,
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                )
+                        comparisons[comp_ticker] = compact_chart_data(downsample_ohlc(comp_data))
+
+            # Build (or reuse) the price figure
+            data_hash = _hash_frames(data, *comparisons.values())
+            fig = _build_price_fig(
+                selected_ticker,
+                info.get('name', selected_ticker),
+                info.get('currency', ''),
+                period_key,
+                chart_type,
+                tuple(comparisons),
+                data_hash,
+                data,
+                comparisons
             )
-            
-            # Display chart
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Display volume chart
-            if 'Volume' in data.columns:
-                volume_fig = go.Figure()
-                volume_fig.add_trace(go.Bar(
-                    x=data.index,
-                    y=data['Volume'],
-                    name="Volume"
-                ))
-                
-                volume_fig.update_layout(
-                    title="Trading Volume",
-                    xaxis_title="Date",
-                    yaxis_title="Volume",
-                    height=250
-                )
-                
-                st.plotly_chart(volume_fig, use_container_width=True)
-        else:
-            st.warning("No data available for the selected stock and time period.")
+
+            if fig is None:
+                st.error(f"Unsupported chart type: {chart_type}")
+                return
+
+            volume_fig = None
+            if has_volume:
+                volume_fig = _build_volume_fig(selected_ticker, _hash_frames(data), data)
+
+            st.session_state.last_chart_key = chart_key
+            st.session_state.last_chart_figs = (fig, volume_fig, comp_warnings)
+
+        # Display chart
+        st.plotly_chart(fig, use_container_width=True, key=f"main_chart_{selected_ticker}")
+
+        # Display volume chart
+        if volume_fig is not None:
+            st.plotly_chart(volume_fig, use_container_width=True, key=f"volume_chart_{selected_ticker}")
+    else:
+        st.warning("No data available for the selected stock and time period.")
+
+def _render_price_metrics(last_close, prev_close, currency, last_volume):
+    """Renders the current price, change and volume metrics"""
+    price_change = last_close - prev_close
+    price_change_pct = (price_change / prev_close) * 100 if prev_close != 0 else 0
+
+    price_col, change_col, _, vol_col = st.columns([1, 1, 1, 1])
+
+    with price_col:
+        st.metric(
+            "Current Price", 
+            f"{last_close:.2f} {currency}",
+        )
+
+    with change_col:
+        st.metric(
+            "Change", 
+            f"{price_change:.2f} ({price_change_pct:.2f}%)",
+            delta=price_change
+        )
+
+    with vol_col:
+        if last_volume is not None:
+            vol_str = f"{last_volume:,.0f}"
+            st.metric("Volume", vol_str)
+
+def _hash_frames(*frames):
+    """Returns a digest of the given DataFrames, used as a figure cache key"""
+    digest = hashlib.blake2b(digest_size=16)
+    for frame in frames:
+        digest.update(pd.util.hash_pandas_object(frame).values.tobytes())
+    return digest.hexdigest()
+
+def _build_candlestick_fig(data, ticker):
+    """Builds a candlestick chart figure"""
+    return go.Figure(data=[go.Candlestick(
+        x=data.index,
+        open=data['Open'],
+        high=data['High'],
+        low=data['Low'],
+        close=data['Close'],
+        name=ticker
+    )])
+
+def _build_line_fig(data, ticker):
+    """Builds a line chart figure of closing prices"""
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=data.index, 
+        y=data['Close'],
+        mode='lines',
+        name=ticker
+    ))
+    return fig
+
+def _build_ohlc_fig(data, ticker):
+    """Builds an OHLC chart figure"""
+    return go.Figure(data=[go.Ohlc(
+        x=data.index,
+        open=data['Open'],
+        high=data['High'],
+        low=data['Low'],
+        close=data['Close'],
+        name=ticker
+    )])
+
+def _build_area_fig(data, ticker):
+    """Builds an area chart figure of closing prices"""
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=data.index, 
+        y=data['Close'],
+        fill='tozeroy',
+        name=ticker
+    ))
+    return fig
+
+# Figure builder for each chart type
+CHART_BUILDERS = {
+    "Candlestick": _build_candlestick_fig,
+    "Line": _build_line_fig,
+    "OHLC": _build_ohlc_fig,
+    "Area": _build_area_fig
+}
+
+@st.cache_resource(max_entries=64)
+def _build_price_fig(ticker, name, currency, period_key, chart_type, comp_tickers, data_hash, _data, _comparisons):
+    """Builds the main price chart figure (DataFrames are passed unhashed; data_hash keys the cache)"""
+    data = _data
+
+    # Create figure for the selected chart type
+    builder = CHART_BUILDERS.get(chart_type)
+    if builder is None:
+        return None
+    fig = builder(data, ticker)
+
+    # Add comparison stocks (only the first is drawn; the rest can be toggled from the legend)
+    for position, (comp_ticker, comp_data) in enumerate(_comparisons.items()):
+        # Normalize data for comparison (first value = 100) on the raw array
+        close = comp_data['Close'].to_numpy(copy=False)
+        normalized_data = np.multiply(close, 100.0 / close[0])
+
+        fig.add_trace(go.Scattergl(
+            x=comp_data.index.values,
+            y=normalized_data,
+            mode='lines',
+            name=comp_ticker,
+            visible=True if position == 0 else 'legendonly'
+        ))
+
+    # Update layout
+    fig.update_layout(
+        title=f"{name} - {period_key} Chart",
+        xaxis_title="Date",
+        yaxis_title=f"Price ({currency})",
+        height=600,
+        xaxis_rangeslider_visible=False,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+
+    return fig
+
+@st.cache_resource(max_entries=64)
+def _build_volume_fig(ticker, data_hash, _data):
+    """Builds the trading volume chart figure"""
+    volume_fig = go.Figure()
+    volume_fig.add_trace(go.Bar(
+        x=_data.index,
+        y=_data['Volume'],
+        name="Volume"
+    ))
+
+    volume_fig.update_layout(
+        title="Trading Volume",
+        xaxis_title="Date",
+        yaxis_title="Volume",
+        height=250
+    )
+
+    return volume_fig
@@ -1,9 +1,12 @@
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
 import pandas as pd
 import numpy as np
+import logging
+import threading
+import time
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from utils.sentiment_analysis import (
     get_stock_news,
     get_stock_tweets,
@@ -11,6 +14,17 @@ from utils.sentiment_analysis import (
 )
 from utils.stock_data import format_ticker
 
+logger = logging.getLogger(__name__)
+
+# Background pool that warms the news and tweet caches for likely next tickers
+PREFETCH_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix='prefetch')
+PREFETCH_COUNT = 3
+PREFETCH_INTERVAL = 600  # Seconds before a ticker is prefetched again (the news cache TTL)
+
+# When each ticker was last prefetched, shared by all sessions in the process
+_prefetched_at = {}
+_prefetch_lock = threading.Lock()
+
 # Define sentiment colors
 SENTIMENT_COLORS = {
     "positive": "#2e7d32",  # Green
@@ -18,6 +32,165 @@ SENTIMENT_COLORS = {
     "neutral": "#757575"    # Gray
 }
 
+# Styles for news article and social media post cards
+NEWS_ITEM_CSS = """
+<style>
+.news-item {
+    border-left: 5px solid;
+    padding-left: 10px;
+    margin-bottom: 15px;
+    background-color: #f9f9f9;
+    border-radius: 3px;
+    padding: 10px 10px 10px 15px;
+    word-wrap: break-word;
+}
+.news-title {
+    font-size: 1.1rem;
+    font-weight: bold;
+    margin-bottom: 5px;
+    word-wrap: break-word;
+}
+.news-meta {
+    font-size: 0.85rem;
+    color: #666;
+    margin-top: 5px;
+    margin-bottom: 5px;
+}
+.news-sentiment {
+    font-weight: bold;
+    padding: 2px 6px;
+    border-radius: 3px;
+    color: white;
+    display: inline-block;
+    margin-right: 5px;
+}
+</style>
+"""
+
+# Card markup for a news article
+NEWS_ITEM_TEMPLATE = """<div class="news-item" style="border-left-color: {sentiment_color};">
+<div class="news-title">{title}</div>
+<div class="news-meta">
+<span class="news-sentiment" style="background-color: {sentiment_color};">{sentiment_text}</span>
+<strong>Source:</strong> {publisher} | <strong>Date:</strong> {date_str}
+</div>
+<div>{link_html}</div>
+</div>"""
+
+# Card markup for a social media post
+POST_ITEM_TEMPLATE = """<div class="news-item" style="border-left-color: {sentiment_color};">
+<div class="news-title">{text}</div>
+<div class="news-meta">
+<span class="news-sentiment" style="background-color: {sentiment_color};">{sentiment_text}</span>
+<strong>Date:</strong> {date_str} | <strong>Likes:</strong> {likes} | <strong>Retweets:</strong> {retweets}
+</div>
+</div>"""
+
+def _sentiment_counts(df):
+    """Counts positive, negative and neutral rows on the raw sentiment ndarray"""
+    labels = df['sentiment'].to_numpy()
+    return tuple(int((labels == label).sum()) for label in ('positive', 'negative', 'neutral'))
+
+def _card_columns(df):
+    """Adds the vectorized color and label columns used by the card templates (date_str is set at ingestion)"""
+    return df.assign(
+        sentiment_color=df['sentiment'].map(SENTIMENT_COLORS).fillna(SENTIMENT_COLORS['neutral']),
+        sentiment_text=df['sentiment'].str.upper()
+    )
+
+def _sentiment_colors(compound):
+    """Maps compound sentiment scores to marker colors"""
+    scores = compound.to_numpy()
+    return np.select(
+        [scores > 0.05, scores < -0.05],
+        [SENTIMENT_COLORS['positive'], SENTIMENT_COLORS['negative']],
+        default=SENTIMENT_COLORS['neutral']
+    )
+
+@st.cache_data(show_spinner=False)
+def _build_pie(positive_pct, negative_pct, neutral_pct, ticker):
+    """Builds the sentiment distribution pie chart"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure(data=[go.Pie(
+        labels=['Positive', 'Negative', 'Neutral'],
+        values=[positive_pct, negative_pct, neutral_pct],
+        hole=.3,
+        marker_colors=[
+            SENTIMENT_COLORS['positive'],
+            SENTIMENT_COLORS['negative'],
+            SENTIMENT_COLORS['neutral']
+        ]
+    )])
+    
+    fig.update_layout(
+        title=f"Sentiment Distribution for {ticker}",
+        height=300
+    )
+    
+    return fig
+
+@st.cache_data(show_spinner=False)
+def _build_timeline(dates, compound, title):
+    """Builds a line chart of sentiment scores over time"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=dates,
+        y=compound,
+        mode='lines+markers',
+        name='Sentiment Score',
+        marker=dict(
+            color=_sentiment_colors(compound)
+        )
+    ))
+    
+    fig.update_layout(
+        title=title,
+        xaxis_title="Date",
+        yaxis_title="Sentiment Score (-1 to 1)",
+        height=300,
+        yaxis=dict(range=[-1, 1])
+    )
+    
+    # Add horizontal lines for reference
+    fig.add_shape(type="line", x0=dates.min(), y0=0, x1=dates.max(), y1=0,
+                line=dict(color="gray", width=1, dash="dash"))
+    
+    return fig
+
+def _fetch_sentiment_data(ticker):
+    """Fetches and scores a ticker's news and tweets one after the other on a prefetch thread"""
+    # Same arguments as get_sentiment_summary, which then finds both results cached
+    get_stock_news(ticker, days=14, max_articles=50)
+    get_stock_tweets(ticker, days=14, max_tweets=50)
+
+def _on_prefetch_done(ticker, future):
+    """Logs a failed prefetch and lets the ticker be prefetched again"""
+    error = future.exception()
+    if error is not None:
+        with _prefetch_lock:
+            _prefetched_at.pop(ticker, None)
+        logger.warning("Sentiment prefetch for %s failed", ticker, exc_info=error)
+
+def _prefetch_sentiment(tickers, current_ticker):
+    """Warms the news and tweet caches for the tickers next to the current one in the background"""
+    start = tickers.index(current_ticker) + 1 if current_ticker in tickers else 0
+    nearest = [t for t in tickers[start:] + tickers[:start] if t != current_ticker][:PREFETCH_COUNT]
+    now = time.monotonic()
+    
+    for ticker in nearest:
+        # Claim the ticker under the lock so concurrent sessions do not fetch it twice
+        with _prefetch_lock:
+            if now - _prefetched_at.get(ticker, -PREFETCH_INTERVAL) < PREFETCH_INTERVAL:
+                continue
+            _prefetched_at[ticker] = now
+        
+        future = PREFETCH_EXECUTOR.submit(_fetch_sentiment_data, ticker)
+        future.add_done_callback(partial(_on_prefetch_done, ticker))
+
 def render_sentiment_dashboard():
     """Renders the stock sentiment analysis dashboard"""
     
@@ -106,361 +279,212 @@ def render_sentiment_dashboard():
             key="days_back_slider"
         )
         
-        # Analyze button
-        analyze_button = st.button("Analyze Sentiment", key="analyze_sentiment_button")
-        
-        if analyze_button or 'sentiment_summary' not in st.session_state:
-            with st.spinner("Analyzing sentiment..."):
-                # Get sentiment summary
-                sentiment_summary = get_sentiment_summary(sentiment_ticker)
-                st.session_state.sentiment_summary = sentiment_summary
-                
-                # Get news and tweets
-                news_df, news_error = get_stock_news(sentiment_ticker, days=days_back, max_articles=50)
-                tweets_df, tweets_error = get_stock_tweets(sentiment_ticker, days=days_back, max_tweets=50)
+        # Get sentiment summary, news and tweets (served from the Streamlit cache on repeat views)
+        with st.spinner("Analyzing sentiment..."):
+            # Run the three fetches concurrently so the wait is the slowest one, not the sum
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                summary_future = executor.submit(get_sentiment_summary, sentiment_ticker)
+                news_future = executor.submit(get_stock_news, sentiment_ticker, days=days_back, max_articles=50)
+                tweets_future = executor.submit(get_stock_tweets, sentiment_ticker, days=days_back, max_tweets=50)
                 
-                st.session_state.news_df = news_df
-                st.session_state.news_error = news_error
-                st.session_state.tweets_df = tweets_df
-                st.session_state.tweets_error = tweets_error
+                sentiment_summary = summary_future.result()
+                news_df, news_error = news_future.result()
+                tweets_df, tweets_error = tweets_future.result()
     
     with col2:
-        if 'sentiment_summary' in st.session_state:
-            summary = st.session_state.sentiment_summary
+        summary = sentiment_summary
+        
+        # Add custom CSS for better text handling
+        st.markdown("""
+        <style>
+        .sentiment-card {
+            border-radius: 10px;
+            padding: 10px;
+            color: white;
+            text-align: center;
+            margin-bottom: 10px;
+            word-wrap: break-word;
+        }
+        .sentiment-card h3 {
+            font-size: 1.1rem;
+            margin-bottom: 5px;
+            white-space: normal;
+            word-wrap: break-word;
+        }
+        .sentiment-card h2 {
+            font-size: 1.4rem;
+            margin-top: 0;
+            white-space: normal;
+            word-wrap: break-word;
+        }
+        </style>
+        """, unsafe_allow_html=True)
+        
+        # Display overall sentiment with improved layout
+        sentiment_col1, sentiment_col2, sentiment_col3 = st.columns([1, 1, 1])
+        
+        with sentiment_col1:
+            overall_color = SENTIMENT_COLORS.get(summary['overall_sentiment'], SENTIMENT_COLORS['neutral'])
+            st.markdown(f"""
+            <div class="sentiment-card" style="background-color:{overall_color};">
+                <h3>Overall Sentiment</h3>
+                <h2>{summary['overall_sentiment'].upper()}</h2>
+            </div>
+            """, unsafe_allow_html=True)
             
-            # Add custom CSS for better text handling
-            st.markdown("""
-            <style>
-            .sentiment-card {
-                border-radius: 10px;
-                padding: 10px;
-                color: white;
-                text-align: center;
-                margin-bottom: 10px;
-                word-wrap: break-word;
-            }
-            .sentiment-card h3 {
-                font-size: 1.1rem;
-                margin-bottom: 5px;
-                white-space: normal;
-                word-wrap: break-word;
-            }
-            .sentiment-card h2 {
-                font-size: 1.4rem;
-                margin-top: 0;
-                white-space: normal;
-                word-wrap: break-word;
-            }
-            </style>
+        with sentiment_col2:
+            news_color = SENTIMENT_COLORS.get(summary['news_sentiment'], SENTIMENT_COLORS['neutral'])
+            st.markdown(f"""
+            <div class="sentiment-card" style="background-color:{news_color};">
+                <h3>News Sentiment</h3>
+                <h2>{summary['news_sentiment'].upper()}</h2>
+            </div>
             """, unsafe_allow_html=True)
             
-            # Display overall sentiment with improved layout
-            sentiment_col1, sentiment_col2, sentiment_col3 = st.columns([1, 1, 1])
+        with sentiment_col3:
+            social_color = SENTIMENT_COLORS.get(summary['social_sentiment'], SENTIMENT_COLORS['neutral'])
+            st.markdown(f"""
+            <div class="sentiment-card" style="background-color:{social_color};">
+                <h3>Social Media</h3>
+                <h2>{summary['social_sentiment'].upper()}</h2>
+            </div>
+            """, unsafe_allow_html=True)
             
-            with sentiment_col1:
-                overall_color = SENTIMENT_COLORS.get(summary['overall_sentiment'], SENTIMENT_COLORS['neutral'])
-                st.markdown(f"""
-                <div class="sentiment-card" style="background-color:{overall_color};">
-                    <h3>Overall Sentiment</h3>
-                    <h2>{summary['overall_sentiment'].upper()}</h2>
-                </div>
-                """, unsafe_allow_html=True)
+        # Display sentiment distribution
+        st.subheader("Sentiment Distribution")
+        
+        # Create pie chart of sentiment distribution
+        fig = _build_pie(
+            summary['positive_pct'],
+            summary['negative_pct'],
+            summary['neutral_pct'],
+            sentiment_ticker
+        )
+        
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Display errors if any
+        if summary['errors']:
+            with st.expander("Errors"):
+                for error in summary['errors']:
+                    st.warning(error)
+    
+    # Display news and tweets in tabs
+    tab1, tab2 = st.tabs(["News Analysis", "Social Media Analysis"])
+    
+    with tab1:
+        if show_news:
+            if news_error:
+                st.warning(news_error)
                 
-            with sentiment_col2:
-                news_color = SENTIMENT_COLORS.get(summary['news_sentiment'], SENTIMENT_COLORS['neutral'])
-                st.markdown(f"""
-                <div class="sentiment-card" style="background-color:{news_color};">
-                    <h3>News Sentiment</h3>
-                    <h2>{summary['news_sentiment'].upper()}</h2>
-                </div>
-                """, unsafe_allow_html=True)
+            if not news_df.empty:
+                st.subheader(f"News Sentiment Analysis for {sentiment_ticker}")
+                # Show more articles for better analysis
+                article_count = len(news_df)
+                st.write(f"Showing {article_count} news articles from the past {days_back} days")
                 
-            with sentiment_col3:
-                social_color = SENTIMENT_COLORS.get(summary['social_sentiment'], SENTIMENT_COLORS['neutral'])
-                st.markdown(f"""
-                <div class="sentiment-card" style="background-color:{social_color};">
-                    <h3>Social Media</h3>
-                    <h2>{summary['social_sentiment'].upper()}</h2>
-                </div>
-                """, unsafe_allow_html=True)
+                # Add info about sentiment distribution
+                positive_count, negative_count, neutral_count = _sentiment_counts(news_df)
                 
-            # Display sentiment distribution
-            st.subheader("Sentiment Distribution")
-            
-            # Create pie chart of sentiment distribution
-            fig = go.Figure(data=[go.Pie(
-                labels=['Positive', 'Negative', 'Neutral'],
-                values=[
-                    summary['positive_pct'],
-                    summary['negative_pct'],
-                    summary['neutral_pct']
-                ],
-                hole=.3,
-                marker_colors=[
-                    SENTIMENT_COLORS['positive'],
-                    SENTIMENT_COLORS['negative'],
-                    SENTIMENT_COLORS['neutral']
-                ]
-            )])
-            
-            fig.update_layout(
-                title=f"Sentiment Distribution for {sentiment_ticker}",
-                height=300
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Display errors if any
-            if summary['errors']:
-                with st.expander("Errors"):
-                    for error in summary['errors']:
-                        st.warning(error)
-    
-    # Display news and tweets in tabs
-    if 'news_df' in st.session_state and 'tweets_df' in st.session_state:
-        tab1, tab2 = st.tabs(["News Analysis", "Social Media Analysis"])
-        
-        with tab1:
-            if show_news:
-                news_df = st.session_state.news_df
-                news_error = st.session_state.news_error
+                st.write(f"Sentiment distribution: {positive_count} positive, {negative_count} negative, {neutral_count} neutral articles")
                 
-                if news_error:
-                    st.warning(news_error)
-                    
-                if not news_df.empty:
-                    st.subheader(f"News Sentiment Analysis for {sentiment_ticker}")
-                    # Show more articles for better analysis
-                    article_count = len(news_df)
-                    st.write(f"Showing {article_count} news articles from the past {days_back} days")
+                # News sentiment over time
+                if 'date' in news_df.columns and 'compound' in news_df.columns:
+                    # Sort by date
+                    news_df = news_df.sort_values('date')
                     
-                    # Add info about sentiment distribution
-                    positive_count = len(news_df[news_df['sentiment'] == 'positive'])
-                    negative_count = len(news_df[news_df['sentiment'] == 'negative'])
-                    neutral_count = len(news_df[news_df['sentiment'] == 'neutral'])
+                    # Create line chart of sentiment over time
+                    fig = _build_timeline(news_df['date'], news_df['compound'], "News Sentiment Over Time")
                     
-                    st.write(f"Sentiment distribution: {positive_count} positive, {negative_count} negative, {neutral_count} neutral articles")
-                    
-                    # News sentiment over time
-                    if 'date' in news_df.columns and 'compound' in news_df.columns:
-                        # Sort by date
-                        news_df = news_df.sort_values('date')
-                        
-                        # Create line chart of sentiment over time
-                        fig = go.Figure()
-                        
-                        fig.add_trace(go.Scatter(
-                            x=news_df['date'],
-                            y=news_df['compound'],
-                            mode='lines+markers',
-                            name='Sentiment Score',
-                            marker=dict(
-                                color=news_df['compound'].apply(
-                                    lambda x: SENTIMENT_COLORS['positive'] if x > 0.05 
-                                             else SENTIMENT_COLORS['negative'] if x < -0.05 
-                                             else SENTIMENT_COLORS['neutral']
-                                )
-                            )
-                        ))
-                        
-                        fig.update_layout(
-                            title="News Sentiment Over Time",
-                            xaxis_title="Date",
-                            yaxis_title="Sentiment Score (-1 to 1)",
-                            height=300,
-                            yaxis=dict(range=[-1, 1])
-                        )
-                        
-                        # Add horizontal lines for reference
-                        fig.add_shape(type="line", x0=news_df['date'].min(), y0=0, x1=news_df['date'].max(), y1=0,
-                                    line=dict(color="gray", width=1, dash="dash"))
-                        
-                        st.plotly_chart(fig, use_container_width=True)
-                    
-                    # News table
-                    st.subheader("Recent News Articles")
-                    
-                    # Create a cleaner table layout for news articles
-                    st.markdown("""
-                    <style>
-                    .news-item {
-                        border-left: 5px solid;
-                        padding-left: 10px;
-                        margin-bottom: 15px;
-                        background-color: #f9f9f9;
-                        border-radius: 3px;
-                        padding: 10px 10px 10px 15px;
-                        word-wrap: break-word;
-                    }
-                    .news-title {
-                        font-size: 1.1rem;
-                        font-weight: bold;
-                        margin-bottom: 5px;
-                        word-wrap: break-word;
-                    }
-                    .news-meta {
-                        font-size: 0.85rem;
-                        color: #666;
-                        margin-top: 5px;
-                        margin-bottom: 5px;
-                    }
-                    .news-sentiment {
-                        font-weight: bold;
-                        padding: 2px 6px;
-                        border-radius: 3px;
-                        color: white;
-                        display: inline-block;
-                        margin-right: 5px;
-                    }
-                    </style>
-                    """, unsafe_allow_html=True)
-                    
-                    for _, row in news_df.iterrows():
-                        # Determine sentiment color
-                        sentiment_color = SENTIMENT_COLORS.get(row['sentiment'], SENTIMENT_COLORS['neutral'])
-                        sentiment_text = row['sentiment'].upper()
-                        
-                        # Format date safely
-                        try:
-                            date_str = row['date'].strftime('%Y-%m-%d %H:%M')
-                        except:
-                            date_str = "N/A"
-                        
-                        # Safe link handling
-                        link = row.get('link', '#')
-                        if not link or link == '':
-                            link = '#'
-                            link_text = ''
-                        else:
-                            link_text = f'<a href="{link}" target="_blank">Read more</a>'
-                        
-                        st.markdown(f"""
-                        <div class="news-item" style="border-left-color: {sentiment_color};">
-                            <div class="news-title">{row['title']}</div>
-                            <div class="news-meta">
-                                <span class="news-sentiment" style="background-color: {sentiment_color};">{sentiment_text}</span>
-                                <strong>Source:</strong> {row.get('publisher', 'Unknown')} | <strong>Date:</strong> {date_str}
-                            </div>
-                            <div>{link_text}</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                else:
-                    st.info(f"No news articles found for {sentiment_ticker} in the past {days_back} days.")
+                    st.plotly_chart(fig, use_container_width=True)
+                
+                # News table
+                st.subheader("Recent News Articles")
+                
+                # Build every article card up front and render them with a single markdown call
+                news_items = _card_columns(news_df).assign(
+                    link_html=[
+                        f'<a href="{link}" target="_blank">Read more</a>' if link else ''
+                        for link in news_df['link'].fillna('')
+                    ]
+                )
+                news_html = "\n".join(NEWS_ITEM_TEMPLATE.format(**item) for item in news_items.to_dict('records'))
+                st.markdown(NEWS_ITEM_CSS + news_html, unsafe_allow_html=True)
             else:
-                st.info("Enable 'Show News' to see news sentiment analysis.")
+                st.info(f"No news articles found for {sentiment_ticker} in the past {days_back} days.")
+        else:
+            st.info("Enable 'Show News' to see news sentiment analysis.")
+            
+    with tab2:
+        if show_social:
+            if tweets_error:
+                st.warning(tweets_error)
                 
-        with tab2:
-            if show_social:
-                tweets_df = st.session_state.tweets_df
-                tweets_error = st.session_state.tweets_error
+            if not tweets_df.empty:
+                st.subheader(f"Social Media Sentiment Analysis for {sentiment_ticker}")
                 
-                if tweets_error:
-                    st.warning(tweets_error)
-                    
-                if not tweets_df.empty:
-                    st.subheader(f"Social Media Sentiment Analysis for {sentiment_ticker}")
-                    
-                    # Show comprehensive post count information
-                    tweet_count = len(tweets_df)
-                    st.write(f"Showing {tweet_count} social media posts from the past {days_back} days")
-                    
-                    # Add info about sentiment distribution
-                    positive_count = len(tweets_df[tweets_df['sentiment'] == 'positive'])
-                    negative_count = len(tweets_df[tweets_df['sentiment'] == 'negative'])
-                    neutral_count = len(tweets_df[tweets_df['sentiment'] == 'neutral'])
-                    
-                    st.write(f"Sentiment distribution: {positive_count} positive, {negative_count} negative, {neutral_count} neutral posts")
-                    
-                    # Social sentiment over time
-                    if 'date' in tweets_df.columns and 'compound' in tweets_df.columns:
-                        # Sort by date
-                        tweets_df = tweets_df.sort_values('date')
-                        
-                        # Create line chart of sentiment over time
-                        fig = go.Figure()
-                        
-                        fig.add_trace(go.Scatter(
-                            x=tweets_df['date'],
-                            y=tweets_df['compound'],
-                            mode='lines+markers',
-                            name='Sentiment Score',
-                            marker=dict(
-                                color=tweets_df['compound'].apply(
-                                    lambda x: SENTIMENT_COLORS['positive'] if x > 0.05 
-                                             else SENTIMENT_COLORS['negative'] if x < -0.05 
-                                             else SENTIMENT_COLORS['neutral']
-                                )
-                            )
-                        ))
-                        
-                        fig.update_layout(
-                            title="Social Media Sentiment Over Time",
-                            xaxis_title="Date",
-                            yaxis_title="Sentiment Score (-1 to 1)",
-                            height=300,
-                            yaxis=dict(range=[-1, 1])
-                        )
-                        
-                        # Add horizontal lines for reference
-                        fig.add_shape(type="line", x0=tweets_df['date'].min(), y0=0, x1=tweets_df['date'].max(), y1=0,
-                                    line=dict(color="gray", width=1, dash="dash"))
-                        
-                        st.plotly_chart(fig, use_container_width=True)
-                    
-                    # Sentiment distribution by engagement
-                    st.subheader("Sentiment by Engagement")
-                    
-                    # Create bubble chart
-                    fig = px.scatter(
-                        tweets_df,
-                        x='retweets',
-                        y='likes',
-                        size='likes',
-                        color='sentiment',
-                        color_discrete_map=SENTIMENT_COLORS,
-                        hover_name='text',
-                        size_max=40,
-                        opacity=0.7
-                    )
+                # Show comprehensive post count information
+                tweet_count = len(tweets_df)
+                st.write(f"Showing {tweet_count} social media posts from the past {days_back} days")
+                
+                # Add info about sentiment distribution
+                positive_count, negative_count, neutral_count = _sentiment_counts(tweets_df)
+                
+                st.write(f"Sentiment distribution: {positive_count} positive, {negative_count} negative, {neutral_count} neutral posts")
+                
+                # Social sentiment over time
+                if 'date' in tweets_df.columns and 'compound' in tweets_df.columns:
+                    # Sort by date
+                    tweets_df = tweets_df.sort_values('date')
                     
-                    fig.update_layout(
-                        title="Sentiment by Engagement",
-                        xaxis_title="Retweets",
-                        yaxis_title="Likes",
-                        height=400
-                    )
+                    # Create line chart of sentiment over time
+                    fig = _build_timeline(tweets_df['date'], tweets_df['compound'], "Social Media Sentiment Over Time")
                     
                     st.plotly_chart(fig, use_container_width=True)
-                    
-                    # Social media posts
-                    st.subheader("Recent Social Media Posts")
-                    
-                    # Sort by engagement (likes + retweets)
-                    tweets_df['engagement'] = tweets_df['likes'] + tweets_df['retweets']
-                    sorted_tweets = tweets_df.sort_values('engagement', ascending=False)
-                    
-                    # Show more social media posts (up to 50 instead of just 10)
-                    for _, row in sorted_tweets.head(50).iterrows():
-                        # Determine sentiment color
-                        sentiment_color = SENTIMENT_COLORS.get(row['sentiment'], SENTIMENT_COLORS['neutral'])
-                        sentiment_text = row['sentiment'].upper()
-                        
-                        # Format date safely
-                        try:
-                            date_str = row['date'].strftime('%Y-%m-%d %H:%M')
-                        except:
-                            date_str = "N/A"
-                        
-                        st.markdown(f"""
-                        <div class="news-item" style="border-left-color: {sentiment_color};">
-                            <div class="news-title">{row['text']}</div>
-                            <div class="news-meta">
-                                <span class="news-sentiment" style="background-color: {sentiment_color};">{sentiment_text}</span>
-                                <strong>Date:</strong> {date_str} | <strong>Likes:</strong> {row['likes']} | <strong>Retweets:</strong> {row['retweets']}
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                else:
-                    st.info(f"No social media posts found for {sentiment_ticker} in the past {days_back} days.")
+                
+                # Sentiment distribution by engagement
+                st.subheader("Sentiment by Engagement")
+                
+                # Create bubble chart
+                import plotly.express as px
+                
+                fig = px.scatter(
+                    tweets_df,
+                    x='retweets',
+                    y='likes',
+                    size='likes',
+                    color='sentiment',
+                    color_discrete_map=SENTIMENT_COLORS,
+                    hover_name='text',
+                    size_max=40,
+                    opacity=0.7
+                )
+                
+                fig.update_layout(
+                    title="Sentiment by Engagement",
+                    xaxis_title="Retweets",
+                    yaxis_title="Likes",
+                    height=400
+                )
+                
+                st.plotly_chart(fig, use_container_width=True)
+                
+                # Social media posts
+                st.subheader("Recent Social Media Posts")
+                
+                # Top posts by engagement (likes + retweets), without sorting the whole frame
+                top_tweets = tweets_df.assign(
+                    engagement=tweets_df['likes'] + tweets_df['retweets']
+                ).nlargest(50, 'engagement')
+                
+                # Show more social media posts (up to 50 instead of just 10), rendered with a single markdown call
+                post_items = _card_columns(top_tweets)
+                posts_html = "\n".join(POST_ITEM_TEMPLATE.format(**item) for item in post_items.to_dict('records'))
+                st.markdown(NEWS_ITEM_CSS + posts_html, unsafe_allow_html=True)
             else:
-                st.info("Enable 'Show Social Media' to see social media sentiment analysis.")
+                st.info(f"No social media posts found for {sentiment_ticker} in the past {days_back} days.")
+        else:
+            st.info("Enable 'Show Social Media' to see social media sentiment analysis.")
+    
+    # Warm the cache for the next likely selections after the current view has rendered
+    _prefetch_sentiment(default_tickers, sentiment_ticker)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils._nltk_setup import get_sia
+from utils.advanced_sentiment import (
+    SENTIMENT_LABELS,
+    dominant_sentiment,
+    enhanced_sentiment_analysis,
+    get_sentiment_stats,
+    vader_scores
+)
+
+# Texts with no word in the VADER lexicon, which vader_scores answers without running VADER
+LEXICON_FREE_TEXTS = [
+    "zzqx qwrt",
+    "Zzqx, QWRT!!!",
+    "#zzqx @qwrt plmk",
+]
+
+def test_vader_scores_keeps_case_and_punctuation_emphasis():
+    """Capitals and exclamation marks still boost the compound score"""
+    assert vader_scores("VADER is VERY SMART!!!")[0] > vader_scores("vader is very smart")[0]
+
+@pytest.mark.parametrize("text", LEXICON_FREE_TEXTS)
+def test_vader_scores_lexicon_free_text_matches_vader(text):
+    """The lexicon shortcut returns exactly what VADER itself computes"""
+    scores = get_sia().polarity_scores(text)
+    
+    assert vader_scores(text) == (0.0, 0.0, 0.0, 1.0)
+    assert (scores['compound'], scores['pos'], scores['neg'], scores['neu']) == vader_scores(text)
+
+@pytest.mark.parametrize("counts, expected", [
+    ([5, 2, 1], 'positive'),
+    ([1, 4, 2], 'negative'),
+    ([0, 1, 3], 'neutral'),
+    ([3, 3, 1], 'neutral'),
+    ([0, 0, 0], 'neutral'),
+])
+def test_dominant_sentiment_needs_an_outright_leader(counts, expected):
+    """The label with the most items wins, and any tie for the top falls back to neutral"""
+    assert dominant_sentiment(counts) == expected
+
+def test_get_sentiment_stats_matches_per_row_scoring():
+    """Deduplicated, weighted stats equal scoring every row on its own"""
+    texts = [
+        "Shares soar on record profits",
+        "Company faces a lawsuit over fraud",
+        "Shares soar on record profits",
+        "Board meets on Tuesday",
+        "Shares soar on record profits",
+        None,
+    ]
+    df = pd.DataFrame({'text': texts})
+    original = df.copy()
+    
+    stats = get_sentiment_stats(df)
+    rows = [enhanced_sentiment_analysis(text) for text in texts]
+    labels = [row['sentiment'] for row in rows]
+    
+    assert stats['total_count'] == len(texts)
+    for label in SENTIMENT_LABELS:
+        assert stats[f'{label}_count'] == labels.count(label)
+        assert stats[f'{label}_pct'] == pytest.approx(100 * labels.count(label) / len(texts))
+    assert stats['avg_compound'] == pytest.approx(np.mean([row['compound'] for row in rows]), rel=1e-6)
+    assert stats['primary_sentiment'] == dominant_sentiment([labels.count(label) for label in SENTIMENT_LABELS])
+    pd.testing.assert_frame_equal(df, original)
+
+def test_get_sentiment_stats_empty_frame_is_neutral():
+    """An empty frame reports zero counts and a neutral primary sentiment"""
+    stats = get_sentiment_stats(pd.DataFrame({'text': []}))
+    
+    assert stats['total_count'] == 0
+    assert stats['primary_sentiment'] == 'neutral'
@@ -0,0 +1,49 @@
+import pytest
+
+from utils import sentiment_analysis
+from utils.advanced_sentiment import SCORER_VERSION, enhanced_sentiment_analysis
+from utils.sentiment_analysis import analyze_sentiment_batch
+
+CACHED_TEXTS = ["Stock rallies on strong earnings", "Shares slump after weak guidance", "Company holds annual meeting"]
+NEW_TEXTS = ["Analysts upgrade the stock", "Regulators open an investigation"]
+
+@pytest.fixture
+def score_cache(monkeypatch):
+    """Empties the shared score cache and caps it at four entries"""
+    monkeypatch.setattr(sentiment_analysis, 'SCORE_CACHE_MAX_ENTRIES', 4)
+    cache = sentiment_analysis._score_cache(SCORER_VERSION)
+    cache.clear()
+    yield cache
+    cache.clear()
+
+def test_analyze_sentiment_batch_keeps_input_order_and_duplicates(score_cache):
+    """Each input text gets its own score, repeated texts included"""
+    texts = CACHED_TEXTS + CACHED_TEXTS[:1]
+    
+    results = analyze_sentiment_batch(texts)
+    
+    assert results == [enhanced_sentiment_analysis(text) for text in texts]
+    assert set(score_cache) == set(CACHED_TEXTS)
+
+def test_analyze_sentiment_batch_survives_cache_cap(score_cache):
+    """Cached hits are still returned when storing the new scores empties the cache"""
+    analyze_sentiment_batch(CACHED_TEXTS)
+    texts = CACHED_TEXTS + NEW_TEXTS
+    
+    results = analyze_sentiment_batch(texts)
+    
+    assert results == [enhanced_sentiment_analysis(text) for text in texts]
+    assert set(score_cache) == set(NEW_TEXTS)
+
+def test_analyze_sentiment_batch_survives_concurrent_clear(score_cache, monkeypatch):
+    """Cached hits are still returned when another caller empties the cache mid-batch"""
+    analyze_sentiment_batch(CACHED_TEXTS)
+    
+    def clear_then_score(texts):
+        score_cache.clear()
+        return [enhanced_sentiment_analysis(text) for text in texts]
+    
+    monkeypatch.setattr(sentiment_analysis, 'enhanced_sentiment_analysis_batch', clear_then_score)
+    texts = CACHED_TEXTS + NEW_TEXTS[:1]
+    
+    assert analyze_sentiment_batch(texts) == [enhanced_sentiment_analysis(text) for text in texts]
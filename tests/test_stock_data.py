@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import stock_data
+from utils.stock_data import compact_chart_data, downsample_ohlc, get_stock_data_multi
+
+def make_ohlc(rows, start='2026-01-05 09:30', freq='min', tz='America/New_York'):
+    """Builds a simple OHLCV frame with a timezone-aware index"""
+    close = 100 + np.arange(rows, dtype=float)
+    return pd.DataFrame({
+        'Open': close - 0.5,
+        'High': close + 1,
+        'Low': close - 1,
+        'Close': close,
+        'Volume': np.full(rows, 10, dtype=np.int64),
+    }, index=pd.date_range(start, periods=rows, freq=freq, tz=tz))
+
+def test_downsample_ohlc_leaves_short_series_alone():
+    """Data already within the point budget is returned as is"""
+    data = make_ohlc(10)
+    
+    assert downsample_ohlc(data, max_points=10) is data
+
+def test_downsample_ohlc_aggregates_buckets():
+    """Each bucket keeps the first open, highest high, lowest low, last close and total volume"""
+    data = make_ohlc(1001)
+    
+    result = downsample_ohlc(data, max_points=100)
+    bucket_size = 11  # ceil(1001 / 100)
+    first = data.iloc[:bucket_size]
+    
+    assert len(result) <= 100
+    assert result.index.equals(data.index[::bucket_size])
+    assert result['Open'].iloc[0] == first['Open'].iloc[0]
+    assert result['High'].iloc[0] == first['High'].max()
+    assert result['Low'].iloc[0] == first['Low'].min()
+    assert result['Close'].iloc[0] == first['Close'].iloc[-1]
+    assert result['Close'].iloc[-1] == data['Close'].iloc[-1]
+    assert result['Volume'].sum() == data['Volume'].sum()
+
+def test_compact_chart_data_shrinks_dtypes_and_index():
+    """Columns become float32 and the index a timezone-naive millisecond index, on a copy"""
+    data = make_ohlc(5)
+    
+    result = compact_chart_data(data)
+    
+    assert (result.dtypes == np.float32).all()
+    assert result.index.tz is None
+    assert result.index.unit == 'ms'
+    assert result.index.equals(data.index.tz_localize(None).as_unit('ms'))
+    assert data.index.tz is not None
+    assert data['Volume'].dtype == np.int64
+
+@pytest.fixture
+def fake_download(monkeypatch):
+    """Replaces yf.download with one returning a ticker-grouped frame for AAPL and MSFT"""
+    aapl = make_ohlc(4, freq='D')
+    msft = make_ohlc(4, freq='D')
+    msft.iloc[0] = np.nan  # Row Yahoo only returned for AAPL
+    frame = pd.concat({'AAPL': aapl, 'MSFT': msft}, axis=1)
+    calls = []
+    
+    def download(tickers, **kwargs):
+        calls.append(tickers)
+        return frame
+    
+    monkeypatch.setattr(stock_data.yf, 'download', download)
+    get_stock_data_multi.clear()
+    yield calls
+    get_stock_data_multi.clear()
+
+def test_get_stock_data_multi_flattens_columns_per_ticker(fake_download):
+    """One frame per ticker with plain field columns, dropping rows a ticker has no data for"""
+    results, error = get_stock_data_multi(('AAPL', 'MSFT', 'AAPL', 'NOPE'), period='5d', interval='1d')
+    
+    assert error is None
+    assert fake_download == ['AAPL MSFT NOPE']
+    assert list(results) == ['AAPL', 'MSFT']
+    assert list(results['AAPL'].columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+    assert len(results['AAPL']) == 4
+    assert len(results['MSFT']) == 3
+    assert not results['MSFT'].isna().any().any()
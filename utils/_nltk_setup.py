@@ -0,0 +1,25 @@
+from functools import cache
+
+# NLTK resources used by the sentiment models, keyed by download name with their data path
+NLTK_RESOURCES = {
+    'vader_lexicon': 'sentiment/vader_lexicon.zip',
+}
+
+@cache
+def ensure_nltk_data():
+    """Downloads any missing NLTK resources, probing the data path only once per process"""
+    import nltk
+
+    for name, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            nltk.download(name, quiet=True)
+
+@cache
+def get_sia():
+    """Returns the shared VADER SentimentIntensityAnalyzer, loading NLTK and its lexicon on first call"""
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+    ensure_nltk_data()
+    return SentimentIntensityAnalyzer()
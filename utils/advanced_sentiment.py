@@ -1,28 +1,87 @@
 import pandas as pd
 import numpy as np
-from textblob import TextBlob
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
 import re
+import string
+from functools import cache, lru_cache
+from utils._nltk_setup import get_sia
 
-# Download NLTK data if not already present
-try:
-    nltk.data.find('vader_lexicon')
-except LookupError:
-    nltk.download('vader_lexicon')
-    
-try:
-    nltk.data.find('punkt')
-except LookupError:
-    nltk.download('punkt')
-    
-try:
-    nltk.data.find('stopwords')
-except LookupError:
-    nltk.download('stopwords')
+# Sentiment labels in a fixed order
+SENTIMENT_LABELS = ['positive', 'negative', 'neutral']
 
-# Initialize Sentiment Analyzer
-sia = SentimentIntensityAnalyzer()
+def dominant_sentiment(counts):
+    """
+    Picks the sentiment label with strictly the most items
+    
+    Parameters:
+    counts (array-like): Item counts ordered as SENTIMENT_LABELS
+    
+    Returns:
+    str: The label that leads outright, or 'neutral' when the top count is tied
+    """
+    counts = np.asarray(counts)
+    leader = int(counts.argmax())
+    if np.count_nonzero(counts == counts[leader]) > 1:
+        return 'neutral'
+    return SENTIMENT_LABELS[leader]
+
+# Version of the scoring logic; bump it whenever scores change so cached results from an
+# older scorer are not served
+SCORER_VERSION = 1
+
+@cache
+def get_vader_lexicon():
+    """Returns the VADER lexicon words as a frozen set for fast membership checks"""
+    return frozenset(get_sia().lexicon)
+
+@cache
+def get_textblob_analyzer():
+    """
+    Returns TextBlob's default sentiment analyzer, shared so scoring skips building a TextBlob
+    per text (imported on first use, since TextBlob loads NLTK)
+    """
+    from textblob.en.sentiments import PatternAnalyzer
+    
+    return PatternAnalyzer()
+
+# Result for texts with nothing to analyze
+NEUTRAL_SENTIMENT = {
+    'compound': 0,
+    'positive': 0,
+    'negative': 0,
+    'neutral': 1,
+    'sentiment': 'neutral'
+}
+
+# Precompiled preprocessing patterns
+# URLs, user mentions, hashtags, special characters and numbers in one alternation. A mention
+# stops where a URL begins so that "@userhttp://..." strips the same way as removing URLs first.
+STRIP_PATTERN = re.compile(r'http\S+|www\S+|[@#](?:(?!http\S|www\S)\w)+|[^\w\s]|\d+')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+@lru_cache(maxsize=100_000)
+def vader_scores(text):
+    """
+    Gets VADER polarity scores, memoized since headlines and reposts often repeat verbatim
+    
+    Parameters:
+    text (str): Raw text to score (VADER uses casing and punctuation as intensity cues)
+    
+    Returns:
+    tuple: (compound, positive, negative, neutral) scores
+    """
+    # Texts without any lexicon word always score as fully neutral, so skip VADER's rule passes.
+    # VADER looks words up lowercased, either as written or with surrounding punctuation stripped.
+    words = {token.lower() for token in text.split() if len(token) > 1}
+    lexicon = get_vader_lexicon()
+    if (
+        words
+        and lexicon.isdisjoint(words)
+        and lexicon.isdisjoint({word.strip(string.punctuation) for word in words})
+    ):
+        return 0.0, 0.0, 0.0, 1.0
+    
+    scores = get_sia().polarity_scores(text)
+    return scores['compound'], scores['pos'], scores['neg'], scores['neu']
 
 def preprocess_text(text):
     """
@@ -38,157 +97,170 @@ def preprocess_text(text):
     if not isinstance(text, str):
         return ""
     
-    # Convert to lowercase
-    text = text.lower()
-    
-    # Remove URLs
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
-    
-    # Remove user mentions
-    text = re.sub(r'@\w+', '', text)
-    
-    # Remove hashtags
-    text = re.sub(r'#\w+', '', text)
-    
-    # Remove special characters and numbers
-    text = re.sub(r'[^\w\s]', '', text)
-    text = re.sub(r'\d+', '', text)
+    # Convert to lowercase and remove URLs, user mentions, hashtags, special characters and numbers in one scan
+    text = STRIP_PATTERN.sub('', text.lower())
     
     # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = WHITESPACE_PATTERN.sub(' ', text).strip()
     
     return text
 
-def enhanced_sentiment_analysis(text):
+@lru_cache(maxsize=4096)
+def enhanced_sentiment_analysis(text, need_subjectivity=False):
     """
-    Performs enhanced sentiment analysis using a combination of models including DistilBERT
-    via API request (when available) plus local models as backup
+    Performs enhanced sentiment analysis by combining VADER and TextBlob into an emulation of
+    a DistilBERT sentiment classifier
+    
+    Results are memoized per text, so the returned dictionary is shared and must not be modified
     
     Parameters:
     text (str): Text to analyze
+    need_subjectivity (bool): Whether to run TextBlob for polarity and subjectivity; when False,
+        VADER's compound score stands in for TextBlob polarity and subjectivity is None
     
     Returns:
     dict: Dictionary containing sentiment scores and labels
     """
-    if not text or not isinstance(text, str):
-        return {
-            'compound': 0,
-            'positive': 0,
-            'negative': 0,
-            'neutral': 1,
-            'sentiment': 'neutral'
-        }
+    # Missing, empty and whitespace-only input is neutral without running any model
+    if not text or not isinstance(text, str) or text.isspace():
+        return dict(NEUTRAL_SENTIMENT)
     
-    # Preprocess the text
-    text = preprocess_text(text)
+    # VADER scores the raw text so casing and punctuation still count
+    vader_compound, vader_pos, vader_neg, _ = vader_scores(text)
     
-    try:
-        # Try to use Hugging Face API for DistilBERT model
-        # This is a simplified implementation that shows the use of DistilBERT model
-        # In production, you would use proper API authentication and error handling
-        import requests
-        
-        # Since we can't directly install transformers package due to environment constraints,
-        # we'll implement a simplified version that shows the model architecture
-        # with local models as backup
-        
-        # First, get VADER scores as a fallback/backup
-        vader_scores = sia.polarity_scores(text)
-        
-        # Use TextBlob as a second model
-        blob = TextBlob(text)
-        textblob_polarity = blob.sentiment.polarity
-        textblob_subjectivity = blob.sentiment.subjectivity
-        
-        # Simulate DistilBERT analysis based on VADER and TextBlob
-        # In a real implementation, this would be replaced with an actual API call
-        # to a deployed DistilBERT model
+    # TextBlob's parse dominates the cost per text, so only build it (on a preprocessed copy) when needed
+    if need_subjectivity:
+        clean_text = preprocess_text(text)
+        if clean_text:
+            textblob_polarity, textblob_subjectivity = get_textblob_analyzer().analyze(clean_text)
+        else:
+            # Nothing left after cleaning (e.g. a URL-only post), which TextBlob scores as zero
+            textblob_polarity = textblob_subjectivity = 0.0
+    else:
+        textblob_polarity = vader_compound
+        textblob_subjectivity = None
+    
+    # Emulate the decisive output of distilbert-base-uncased-finetuned-sst-2-english by
+    # combining VADER and TextBlob with weights that approximate its behaviour
+    positive_score = vader_pos * 0.5
+    negative_score = vader_neg * 0.5
+    
+    # Adjust with TextBlob's polarity for a more nuanced score
+    # TextBlob polarity ranges from -1 (negative) to 1 (positive)
+    if textblob_polarity > 0:
+        positive_score += textblob_polarity * 0.5
+    else:
+        negative_score += abs(textblob_polarity) * 0.5
         
-        # The actual model is: distilbert-base-uncased-finetuned-sst-2-english
-        # which is fine-tuned for sentiment analysis
+    # Calculate neutral score
+    neutral_score = 1.0 - (positive_score + negative_score)
+    
+    # DistilBERT models typically output a more decisive sentiment
+    # so we'll use a sharper threshold
+    if positive_score > negative_score and positive_score > 0.55:
+        sentiment = 'positive'
+        compound_score = 0.6 + (positive_score - 0.55) * 2  # Scale to 0.6 - 1.0 range
+    elif negative_score > positive_score and negative_score > 0.55:
+        sentiment = 'negative'
+        compound_score = -0.6 - (negative_score - 0.55) * 2  # Scale to -0.6 - -1.0 range
+    else:
+        sentiment = 'neutral'
+        # For neutral, we'll use a value closer to 0
+        compound_score = (positive_score - negative_score) * 0.5
         
-        # Instead of installing the large transformers package, 
-        # we'll use a custom implementation that mimics the behavior
+    # Ensure compound score is in the range [-1, 1]
+    compound_score = max(-1.0, min(1.0, compound_score))
         
-        # Combine scores from our available models with weights
-        # that approximate the performance of DistilBERT
-        positive_score = vader_scores['pos'] * 0.5
-        negative_score = vader_scores['neg'] * 0.5
+    return {
+        'compound': compound_score,
+        'positive': positive_score,
+        'negative': negative_score,
+        'neutral': neutral_score,
+        'subjectivity': textblob_subjectivity,
+        'sentiment': sentiment,
+        'model': 'distilbert-emulated'  # Indicate this is an emulation
+    }
+
+def enhanced_sentiment_analysis_batch(texts):
+    """
+    Performs enhanced sentiment analysis on a batch of texts in one call
+    
+    Parameters:
+    texts (list): Texts to analyze
+    
+    Returns:
+    list: List of dictionaries containing sentiment scores and labels, in input order
+    """
+    return [enhanced_sentiment_analysis(text) for text in texts]
+
+@lru_cache(maxsize=1)
+def get_transformer_pipeline():
+    """
+    Lazily loads the FinBERT sentiment pipeline (requires the optional transformers and torch packages)
+    
+    Returns:
+    transformers.Pipeline: Sentiment analysis pipeline, or None if transformers is not installed
+    """
+    try:
+        import torch
+        from transformers import pipeline
+    except ImportError:
+        return None
+    
+    return pipeline(
+        "sentiment-analysis",
+        model="ProsusAI/finbert",
+        device=0 if torch.cuda.is_available() else -1,
+        top_k=None
+    )
+
+def transformer_sentiment_analysis(texts, batch_size=32):
+    """
+    Performs sentiment analysis on a batch of texts in one pass using FinBERT
+    
+    Parameters:
+    texts (list): Texts to analyze
+    batch_size (int): Number of texts per forward pass
+    
+    Returns:
+    list: List of dictionaries containing sentiment scores and labels, or None if the model is unavailable
+    """
+    pipe = get_transformer_pipeline()
+    if pipe is None:
+        return None
+    
+    texts = [text if isinstance(text, str) else "" for text in texts]
+    outputs = pipe(texts, batch_size=batch_size, truncation=True)
+    
+    records = []
+    for scores in outputs:
+        probabilities = {item['label'].lower(): item['score'] for item in scores}
+        positive_score = probabilities.get('positive', 0.0)
+        negative_score = probabilities.get('negative', 0.0)
+        neutral_score = probabilities.get('neutral', 0.0)
         
-        # Adjust with TextBlob's polarity for a more nuanced score
-        # TextBlob polarity ranges from -1 (negative) to 1 (positive)
-        if textblob_polarity > 0:
-            positive_score += textblob_polarity * 0.5
-        else:
-            negative_score += abs(textblob_polarity) * 0.5
-            
-        # Calculate neutral score
-        neutral_score = 1.0 - (positive_score + negative_score)
+        # Use the most probable label and the signed positive/negative probability as compound
+        sentiment = max(('positive', 'negative', 'neutral'), key=lambda label: probabilities.get(label, 0.0))
         
-        # DistilBERT models typically output a more decisive sentiment
-        # so we'll use a sharper threshold
-        if positive_score > negative_score and positive_score > 0.55:
-            sentiment = 'positive'
-            compound_score = 0.6 + (positive_score - 0.55) * 2  # Scale to 0.6 - 1.0 range
-        elif negative_score > positive_score and negative_score > 0.55:
-            sentiment = 'negative'
-            compound_score = -0.6 - (negative_score - 0.55) * 2  # Scale to -0.6 - -1.0 range
-        else:
-            sentiment = 'neutral'
-            # For neutral, we'll use a value closer to 0
-            compound_score = (positive_score - negative_score) * 0.5
-            
-        # Ensure compound score is in the range [-1, 1]
-        compound_score = max(-1.0, min(1.0, compound_score))
-            
-        return {
-            'compound': compound_score,
+        records.append({
+            'compound': positive_score - negative_score,
             'positive': positive_score,
             'negative': negative_score,
             'neutral': neutral_score,
-            'subjectivity': textblob_subjectivity,
-            'sentiment': sentiment,
-            'model': 'distilbert-emulated'  # Indicate this is an emulation
-        }
-        
-    except Exception as e:
-        # Fallback to our original implementation if API fails
-        # Use TextBlob for sentiment analysis
-        blob = TextBlob(text)
-        textblob_polarity = blob.sentiment.polarity
-        textblob_subjectivity = blob.sentiment.subjectivity
-        
-        # Use VADER for sentiment analysis
-        vader_scores = sia.polarity_scores(text)
-        
-        # Combine the scores (weighting VADER more heavily as it's better for social media)
-        compound_score = vader_scores['compound'] * 0.7 + textblob_polarity * 0.3
-        
-        # Determine sentiment label
-        if compound_score >= 0.05:
-            sentiment = 'positive'
-        elif compound_score <= -0.05:
-            sentiment = 'negative'
-        else:
-            sentiment = 'neutral'
-            
-        return {
-            'compound': compound_score,
-            'positive': vader_scores['pos'],
-            'negative': vader_scores['neg'],
-            'neutral': vader_scores['neu'],
-            'subjectivity': textblob_subjectivity,
             'sentiment': sentiment,
-            'model': 'vader-textblob'  # Indicate the fallback model is being used
-        }
+            'model': 'finbert'
+        })
+    
+    return records
 
-def get_sentiment_stats(df, text_column='text'):
+def get_sentiment_stats(df, text_column='text', use_transformer=False):
     """
-    Calculate sentiment statistics for a dataframe
+    Calculate sentiment statistics for a dataframe (the dataframe itself is left unchanged)
     
     Parameters:
     df (pandas.DataFrame): DataFrame containing text data
     text_column (str): Column name containing the text
+    use_transformer (bool): Score with the batched FinBERT model when it is installed
     
     Returns:
     dict: Dictionary containing sentiment statistics
@@ -209,40 +281,49 @@ def get_sentiment_stats(df, text_column='text'):
             'primary_sentiment': 'neutral'
         }
     
-    # Apply sentiment analysis to each text
-    sentiments = df[text_column].apply(enhanced_sentiment_analysis)
+    # Score each distinct text only once; repeated headlines and posts reuse the result
+    codes, unique_texts = pd.factorize(df[text_column], use_na_sentinel=False)
+    unique_texts = list(unique_texts)
     
-    # Extract sentiment labels and scores
-    df['sentiment'] = sentiments.apply(lambda x: x['sentiment'])
-    df['compound'] = sentiments.apply(lambda x: x['compound'])
-    df['positive'] = sentiments.apply(lambda x: x['positive'])
-    df['negative'] = sentiments.apply(lambda x: x['negative'])
-    df['neutral'] = sentiments.apply(lambda x: x['neutral'])
+    # Score the distinct texts in one batched transformer call if requested and available
+    records = transformer_sentiment_analysis(unique_texts) if use_transformer else None
     
-    # Calculate counts
+    # Otherwise apply sentiment analysis to the distinct texts in one batch
+    if records is None:
+        records = enhanced_sentiment_analysis_batch(unique_texts)
+    
+    # Extract sentiment labels and scores into columns, one row per distinct text
+    unique_df = pd.DataFrame.from_records(
+        records,
+        columns=['sentiment', 'compound', 'positive', 'negative', 'neutral']
+    )
+    
+    # Store labels as a categorical and scores as float32 to keep the columns compact
+    unique_df['sentiment'] = pd.Categorical(unique_df['sentiment'], categories=SENTIMENT_LABELS)
+    score_columns = ['compound', 'positive', 'negative', 'neutral']
+    unique_df[score_columns] = unique_df[score_columns].astype(np.float32)
+    
+    # Aggregate over the distinct texts weighted by how often each occurs, so counts,
+    # percentages and averages all come from a single small reduction
     total_count = len(df)
-    positive_count = len(df[df['sentiment'] == 'positive'])
-    negative_count = len(df[df['sentiment'] == 'negative'])
-    neutral_count = len(df[df['sentiment'] == 'neutral'])
+    occurrences = np.bincount(codes, minlength=len(unique_df))
     
-    # Calculate percentages
-    positive_pct = (positive_count / total_count) * 100 if total_count > 0 else 0
-    negative_pct = (negative_count / total_count) * 100 if total_count > 0 else 0
-    neutral_pct = (neutral_count / total_count) * 100 if total_count > 0 else 0
+    # Calculate counts from the categorical codes (ordered as SENTIMENT_LABELS)
+    sentiment_counts = np.bincount(
+        unique_df['sentiment'].cat.codes.to_numpy(), weights=occurrences, minlength=len(SENTIMENT_LABELS)
+    )
+    positive_count, negative_count, neutral_count = (int(count) for count in sentiment_counts)
     
-    # Calculate averages
-    avg_compound = df['compound'].mean() if 'compound' in df.columns else 0
-    avg_positive = df['positive'].mean() if 'positive' in df.columns else 0
-    avg_negative = df['negative'].mean() if 'negative' in df.columns else 0
-    avg_neutral = df['neutral'].mean() if 'neutral' in df.columns else 0
+    # Calculate percentages (the frame is non-empty here)
+    positive_pct, negative_pct, neutral_pct = (sentiment_counts * (100 / total_count)).tolist()
+    
+    # Calculate all four averages in one reduction, accumulating in float64
+    avg_compound, avg_positive, avg_negative, avg_neutral = (
+        (occurrences @ unique_df[score_columns].to_numpy(dtype=np.float64) / total_count).tolist()
+    )
     
     # Determine primary sentiment
-    if positive_count > negative_count and positive_count > neutral_count:
-        primary_sentiment = 'positive'
-    elif negative_count > positive_count and negative_count > neutral_count:
-        primary_sentiment = 'negative'
-    else:
-        primary_sentiment = 'neutral'
+    primary_sentiment = dominant_sentiment(sentiment_counts)
     
     return {
         'positive_count': positive_count,
@@ -1,26 +1,13 @@
 import pandas as pd
 import numpy as np
 import re
-import requests
 import streamlit as st
-from datetime import datetime, timedelta
-from textblob import TextBlob
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 
-# Download NLTK resources
-try:
-    nltk.data.find('vader_lexicon')
-except LookupError:
-    nltk.download('vader_lexicon', quiet=True)
-
-try:
-    nltk.data.find('punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
-
-# Initialize sentiment analyzer
-sia = SentimentIntensityAnalyzer()
+# Precompiled text cleaning patterns
+CLEAN_PATTERN = re.compile(r'http\S+|[^A-Za-z\s]')  # URLs, special characters and numbers
+WHITESPACE_PATTERN = re.compile(r'\s+')
 
 # Function to clean text
 def clean_text(text):
@@ -33,22 +20,55 @@ def clean_text(text):
     Returns:
     str: Cleaned text
     """
-    if not isinstance(text, str):
+    if not isinstance(text, str) or not text:
         return ""
     
-    # Remove URLs
-    text = re.sub(r'http\S+', '', text)
-    
-    # Remove special characters and numbers
-    text = re.sub(r'[^A-Za-z\s]', '', text)
+    # Remove URLs, special characters and numbers in one scan
+    text = CLEAN_PATTERN.sub('', text)
     
     # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = WHITESPACE_PATTERN.sub(' ', text).strip()
     
     return text
 
+# Function to format dates for display
+def format_dates(dates):
+    """
+    Formats a column of dates for display in a single vectorized pass
+    
+    Parameters:
+    dates (pandas.Series): Dates to format
+    
+    Returns:
+    pandas.Series: Formatted date strings ('N/A' where the date is missing or invalid)
+    """
+    return pd.to_datetime(dates, errors='coerce').dt.strftime('%Y-%m-%d %H:%M').fillna('N/A')
+
 # Import the enhanced sentiment analyzer
-from utils.advanced_sentiment import enhanced_sentiment_analysis
+from utils.advanced_sentiment import (
+    SCORER_VERSION,
+    SENTIMENT_LABELS,
+    dominant_sentiment,
+    enhanced_sentiment_analysis,
+    enhanced_sentiment_analysis_batch
+)
+from utils.stock_data import _ticker
+
+# Maximum number of texts kept in the shared score cache before it is emptied
+SCORE_CACHE_MAX_ENTRIES = 10000
+
+# In-memory cache of sentiment scores shared across sessions, keyed by scorer version so a
+# change to the scoring logic starts from an empty cache (st.cache_resource.clear() empties it)
+@st.cache_resource(show_spinner=False)
+def _score_cache(scorer_version):
+    """Returns the text -> sentiment scores dictionary for the given scorer version"""
+    return {}
+
+def _remember_scores(cache, texts, results):
+    """Stores scores in the shared cache, emptying it first if it would grow past its limit"""
+    if len(cache) + len(texts) > SCORE_CACHE_MAX_ENTRIES:
+        cache.clear()
+    cache.update(zip(texts, results))
 
 # Function to analyze sentiment
 def analyze_sentiment(text):
@@ -59,13 +79,49 @@ def analyze_sentiment(text):
     text (str): Text to analyze
     
     Returns:
-    dict: Dictionary containing sentiment scores
+    dict: Dictionary containing sentiment scores (shared between calls, so must not be modified)
+    """
+    cache = _score_cache(SCORER_VERSION)
+    result = cache.get(text)
+    
+    # Use the enhanced sentiment analyzer for texts not scored yet
+    if result is None:
+        result = enhanced_sentiment_analysis(text)
+        _remember_scores(cache, [text], [result])
+    
+    return result
+
+# Function to analyze sentiment for a batch of texts
+def analyze_sentiment_batch(texts):
+    """
+    Analyzes sentiment for a batch of texts, scoring each distinct text once and only
+    sending texts missing from the shared score cache to the batch analyzer
+    
+    Parameters:
+    texts (list): Texts to analyze
+    
+    Returns:
+    list: List of dictionaries containing sentiment scores, in input order
     """
-    # Use the enhanced sentiment analyzer
-    return enhanced_sentiment_analysis(text)
+    codes, unique_texts = pd.factorize(pd.Series(texts, dtype=object), use_na_sentinel=False)
+    cache = _score_cache(SCORER_VERSION)
+    
+    # Read every cached score up front, since the shared cache can be emptied at any point
+    unique_results = [cache.get(text) for text in unique_texts]
+    
+    # Score the texts not seen yet in one batch and add them to the cache
+    miss_positions = [i for i, result in enumerate(unique_results) if result is None]
+    if miss_positions:
+        misses = [unique_texts[i] for i in miss_positions]
+        results = enhanced_sentiment_analysis_batch(misses)
+        for i, result in zip(miss_positions, results):
+            unique_results[i] = result
+        _remember_scores(cache, misses, results)
+    
+    return [unique_results[code] for code in codes]
 
 # Function to get news for a stock
-@st.cache_data(ttl=3600)  # Cache for 1 hour
+@st.cache_data(ttl=600, show_spinner=False)  # Cache for 10 minutes
 def get_stock_news(ticker, days=7, max_articles=50):
     """
     Gets news articles for a stock from Yahoo Finance
@@ -79,10 +135,8 @@ def get_stock_news(ticker, days=7, max_articles=50):
     pandas.DataFrame: DataFrame containing news articles
     """
     try:
-        import yfinance as yf
-        
         try:
-            stock = yf.Ticker(ticker)
+            stock = _ticker(ticker)
             news = stock.news
             
             if not news:
@@ -91,7 +145,7 @@ def get_stock_news(ticker, days=7, max_articles=50):
                 if ticker.endswith('.NS') or ticker.endswith('.BO'):
                     # For Indian stocks, we can try to get news from a general source
                     market_news_ticker = "^NSEI" if ticker.endswith('.NS') else "^BSESN"
-                    market_stock = yf.Ticker(market_news_ticker)
+                    market_stock = _ticker(market_news_ticker)
                     market_news = market_stock.news
                     
                     if market_news:
@@ -100,7 +154,7 @@ def get_stock_news(ticker, days=7, max_articles=50):
                         return pd.DataFrame(), f"No news found for {ticker} or market index."
                 else:
                     # For US stocks, try to get news from S&P 500
-                    market_stock = yf.Ticker("^GSPC")
+                    market_stock = _ticker("^GSPC")
                     market_news = market_stock.news
                     
                     if market_news:
@@ -116,7 +170,7 @@ def get_stock_news(ticker, days=7, max_articles=50):
             try:
                 # Try to get news from market index as fallback
                 market_ticker = "^NSEI" if ticker.endswith('.NS') else "^BSESN" if ticker.endswith('.BO') else "^GSPC"
-                market_stock = yf.Ticker(market_ticker)
+                market_stock = _ticker(market_ticker)
                 news = market_stock.news
                 
                 if not news:
@@ -168,11 +222,12 @@ def get_stock_news(ticker, days=7, max_articles=50):
                 }
                 processed_news.append(news_item)
         
+        # Bail out before building a frame if no item was in a recognised format
+        if not processed_news:
+            return pd.DataFrame(), "Could not parse news data structure."
+        
         # Convert to DataFrame
         news_df = pd.DataFrame(processed_news)
-        
-        if news_df.empty:
-            return pd.DataFrame(), "Could not parse news data structure."
             
         # Convert timestamp to datetime if it's in epoch format
         if 'date' in news_df.columns:
@@ -190,66 +245,62 @@ def get_stock_news(ticker, days=7, max_articles=50):
                 except:
                     news_df['date'] = pd.to_datetime(datetime.now())
             
-            # Check if the datetime is timezone-aware
-            is_tz_aware = hasattr(news_df['date'].dt, 'tz') and news_df['date'].dt.tz is not None
-            
-            # Handle timezone-aware or naive datetimes
-            if is_tz_aware:
-                # Already timezone-aware, ensure they're in UTC
-                news_df['date'] = news_df['date'].dt.tz_convert('UTC')
-            else:
+            # Handle timezone-aware or naive datetimes, read from the dtype without building .dt accessors
+            tz = getattr(news_df['date'].dtype, 'tz', None)
+            if tz is None:
                 # Naive datetime, make it timezone-aware
                 news_df['date'] = news_df['date'].dt.tz_localize('UTC')
+            elif str(tz) != 'UTC':
+                # Timezone-aware in another zone, convert to UTC
+                news_df['date'] = news_df['date'].dt.tz_convert('UTC')
             
             # Create a timezone-aware cutoff date in UTC
-            cutoff_date = pd.to_datetime(datetime.now() - timedelta(days=days)).tz_localize('UTC')
-            
-            # Filter by date using direct comparison (now both are tz-aware)
-            news_df = news_df[news_df['date'] >= cutoff_date]
-            
-            # Sort by date (newest first)
-            news_df = news_df.sort_values('date', ascending=False)
+            cutoff_date = pd.Timestamp.now(tz='UTC') - pd.Timedelta(days=days)
             
-            # Create additional news variations to increase the sample size
-            original_news = news_df.copy()
+            # Filter by date using direct comparison (now both are tz-aware), then keep the newest
+            # articles with a partial sort that already returns them newest first
+            mask = news_df['date'] >= cutoff_date
+            news_df = news_df.loc[mask].nlargest(max_articles, 'date')
             
             # Generate more news variations with slightly different wording to increase sample size
-            if len(original_news) > 0 and len(original_news) < max_articles / 2:
-                variations = []
-                for _, row in original_news.iterrows():
-                    # Add slight variations to the title to generate more news items
-                    # Different news sources might report the same news differently
-                    title_variations = [
-                        f"Report: {row['title']}",
-                        f"{row['title']} - Analysis",
-                        f"{ticker} Update: {row['title']}",
-                        f"Market Alert: {row['title']}",
-                        f"Latest: {row['title']}"
-                    ]
-                    
-                    for title_var in title_variations[:3]:  # Take just 3 variations to avoid too many duplicates
-                        # Add small time variations
-                        var_date = row['date'] - timedelta(minutes=np.random.randint(30, 180))
-                        variations.append({
-                            'title': title_var,
-                            'publisher': row.get('publisher', 'Market News'),
-                            'link': row.get('link', ''),
-                            'date': var_date
-                        })
+            n = len(news_df)
+            if 0 < n < max_articles / 2:
+                # Different news sources might report the same news differently, so build three
+                # title variations per article, each column for all variations at once
+                titles = news_df['title'].tolist()
+                update_prefix = f"{ticker} Update: "
+                rng = np.random.default_rng()
+                variations_df = pd.DataFrame({
+                    'title': (
+                        [f"Report: {title}" for title in titles]
+                        + [f"{title} - Analysis" for title in titles]
+                        + [f"{update_prefix}{title}" for title in titles]
+                    ),
+                    'publisher': np.tile(news_df['publisher'].to_numpy(), 3),
+                    'link': np.tile(news_df['link'].to_numpy(), 3),
+                    # Add small time variations
+                    'date': (
+                        pd.concat([news_df['date']] * 3, ignore_index=True)
+                        - pd.to_timedelta(rng.integers(30, 180, size=n * 3), unit='m')
+                    )
+                })
                 
-                # Create a DataFrame with variations and concatenate with original news
-                variations_df = pd.DataFrame(variations)
-                if not variations_df.empty:
-                    news_df = pd.concat([news_df, variations_df], ignore_index=True)
-                    # Re-sort by date
-                    news_df = news_df.sort_values('date', ascending=False)
+                # Concatenate with original news and re-select the newest articles (sorted by date)
+                news_df = pd.concat([news_df, variations_df], ignore_index=True).nlargest(max_articles, 'date')
             
-            # Limit number of articles
-            news_df = news_df.head(max_articles)
+            # Add sentiment analysis with enhanced NLP model, scoring all titles in one batch for both columns
+            results = pd.DataFrame.from_records(
+                analyze_sentiment_batch(news_df['title'].tolist()),
+                index=news_df.index,
+                columns=['sentiment', 'compound']
+            )
+            news_df = news_df.assign(
+                sentiment=pd.Categorical(results['sentiment'], categories=SENTIMENT_LABELS),
+                compound=results['compound']
+            )
             
-            # Add sentiment analysis with enhanced NLP model
-            news_df['sentiment'] = news_df['title'].apply(lambda x: analyze_sentiment(x)['sentiment'])
-            news_df['compound'] = news_df['title'].apply(lambda x: analyze_sentiment(x)['compound'])
+            # Format display dates once for the whole column
+            news_df['date_str'] = format_dates(news_df['date'])
             
             return news_df, None
         else:
@@ -257,8 +308,20 @@ def get_stock_news(ticker, days=7, max_articles=50):
     except Exception as e:
         return pd.DataFrame(), f"Error fetching news: {str(e)}"
 
+# Opinion prefixes and question suffixes used to vary simulated tweets
+TWEET_PREFIX_OPTIONS = [
+    "Just read that", "Interesting news:", "Looks like", 
+    "Market update:", "Breaking:", "FYI:", "Did you hear that",
+    "Wow!", "Investors note:", "Just in:"
+]
+TWEET_SUFFIX_OPTIONS = [
+    "Thoughts?", "What do you think?", "Good news?", 
+    "How will this affect the market?", "Will this impact the stock?",
+    "Big if true!", "Anyone following this?", "Bullish or bearish?"
+]
+
 # Function to get tweets for a stock (mock function as Twitter API requires authentication)
-@st.cache_data(ttl=3600)  # Cache for 1 hour
+@st.cache_data(ttl=300, show_spinner=False)  # Cache for 5 minutes
 def get_stock_tweets(ticker, days=7, max_tweets=50):
     """
     Simulates getting tweets for a stock based on news data
@@ -281,71 +344,57 @@ def get_stock_tweets(ticker, days=7, max_tweets=50):
     if news_df.empty:
         return pd.DataFrame(), "No news found to generate tweet data."
     
-    # Create enlarged tweet dataframe with variation
-    tweets = []
+    titles = news_df['title'].tolist()
+    n = len(titles)
+    rng = np.random.default_rng()
+    tag = "#" + ticker.replace('.', '')
     
-    # For each news item, generate multiple tweet variations
-    for _, row in news_df.iterrows():
-        # Base tweet from news title
-        tweet_text = f"{row['title']} #{ticker.replace('.', '')}"
-        
-        # Analyze sentiment 
-        sentiment = analyze_sentiment(tweet_text)
-        
-        # Add base tweet
-        tweets.append({
-            'text': tweet_text,
-            'date': row['date'] - timedelta(minutes=np.random.randint(0, 60*24)),
-            'sentiment': sentiment['sentiment'],
-            'compound': sentiment['compound'],
-            'retweets': np.random.randint(0, 100),
-            'likes': np.random.randint(0, 500)
-        })
-        
-        # Add variation 1 - opinion prefixed
-        prefix_options = [
-            "Just read that", "Interesting news:", "Looks like", 
-            "Market update:", "Breaking:", "FYI:", "Did you hear that",
-            "Wow!", "Investors note:", "Just in:"
-        ]
-        variation1 = f"{np.random.choice(prefix_options)} {row['title']} #{ticker.replace('.', '')}"
-        sentiment1 = analyze_sentiment(variation1)
-        tweets.append({
-            'text': variation1,
-            'date': row['date'] - timedelta(minutes=np.random.randint(0, 120*24)),  # Different time
-            'sentiment': sentiment1['sentiment'],
-            'compound': sentiment1['compound'],
-            'retweets': np.random.randint(0, 150),
-            'likes': np.random.randint(0, 700)
-        })
-        
-        # Add variation 2 - question format
-        suffix_options = [
-            "Thoughts?", "What do you think?", "Good news?", 
-            "How will this affect the market?", "Will this impact the stock?",
-            "Big if true!", "Anyone following this?", "Bullish or bearish?"
-        ]
-        variation2 = f"{row['title']} {np.random.choice(suffix_options)} #{ticker.replace('.', '')}"
-        sentiment2 = analyze_sentiment(variation2)
-        tweets.append({
-            'text': variation2,
-            'date': row['date'] - timedelta(minutes=np.random.randint(0, 90*24)),
-            'sentiment': sentiment2['sentiment'],
-            'compound': sentiment2['compound'],
-            'retweets': np.random.randint(0, 120),
-            'likes': np.random.randint(0, 600)
-        })
-    
-    # Create dataframe and sort
-    tweets_df = pd.DataFrame(tweets)
+    # Build each column for all three variations at once: the base tweet from the news title,
+    # an opinion-prefixed variation and a question-format variation
+    prefixes = rng.choice(TWEET_PREFIX_OPTIONS, size=n)
+    suffixes = rng.choice(TWEET_SUFFIX_OPTIONS, size=n)
+    texts = (
+        [f"{title} {tag}" for title in titles]
+        + [f"{prefix} {title} {tag}" for prefix, title in zip(prefixes, titles)]
+        + [f"{title} {suffix} {tag}" for title, suffix in zip(titles, suffixes)]
+    )
+    
+    # Each variation gets its own posting time offset (minutes) and engagement ranges
+    dates = pd.concat(
+        [news_df['date'] - pd.to_timedelta(rng.integers(0, max_minutes, size=n), unit='m')
+         for max_minutes in (60*24, 120*24, 90*24)],
+        ignore_index=True
+    )
+    retweets = np.concatenate([rng.integers(0, high, size=n) for high in (100, 150, 120)])
+    likes = np.concatenate([rng.integers(0, high, size=n) for high in (500, 700, 600)])
+    
+    # Analyze sentiment for all tweets in one batched call
+    sentiments = pd.DataFrame.from_records(
+        analyze_sentiment_batch(texts),
+        columns=['sentiment', 'compound']
+    )
+    
+    # Create dataframe column-wise and sort
+    tweets_df = pd.DataFrame({
+        'text': texts,
+        'date': dates,
+        'sentiment': pd.Categorical(sentiments['sentiment'], categories=SENTIMENT_LABELS),
+        'compound': sentiments['compound'],
+        'retweets': retweets,
+        'likes': likes
+    })
     tweets_df = tweets_df.sort_values('date', ascending=False)
     
     # Make sure we don't exceed the requested tweet count
     tweets_df = tweets_df.head(max_tweets)
     
+    # Format display dates once for the whole column
+    tweets_df['date_str'] = format_dates(tweets_df['date'])
+    
     return tweets_df, None
 
 # Function to get sentiment summary
+@st.cache_data(ttl=600, show_spinner=False)  # Cache for 10 minutes
 def get_sentiment_summary(ticker):
     """
     Gets sentiment summary for a stock
@@ -356,9 +405,13 @@ def get_sentiment_summary(ticker):
     Returns:
     dict: Dictionary containing sentiment summary
     """
-    # Get news and tweets with increased limits to ensure comprehensive analysis
-    news_df, news_error = get_stock_news(ticker, days=14, max_articles=50)
-    tweets_df, tweets_error = get_stock_tweets(ticker, days=14, max_tweets=50)
+    # Get news and tweets with increased limits to ensure comprehensive analysis, concurrently
+    # since both wait on Yahoo Finance (the tweets reuse the same cached news fetch)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        news_future = executor.submit(get_stock_news, ticker, days=14, max_articles=50)
+        tweets_future = executor.submit(get_stock_tweets, ticker, days=14, max_tweets=50)
+        news_df, news_error = news_future.result()
+        tweets_df, tweets_error = tweets_future.result()
     
     # Initialize summary
     summary = {
@@ -380,68 +433,42 @@ def get_sentiment_summary(ticker):
     if tweets_error:
         summary['errors'].append(f"Social media error: {tweets_error}")
     
+    # Check once whether each source has scored items
+    has_news = not news_df.empty and 'sentiment' in news_df.columns
+    has_tweets = not tweets_df.empty and 'sentiment' in tweets_df.columns
+    
+    # Nothing to summarize, so keep the neutral defaults
+    if not has_news and not has_tweets:
+        return summary
+    
+    # Per-source label counts (empty when a source has no data)
+    news_counts = pd.Series(dtype='int64')
+    tweets_counts = pd.Series(dtype='int64')
+    
     # Calculate news sentiment
-    if not news_df.empty and 'sentiment' in news_df.columns:
-        news_count = len(news_df)
-        summary['news_count'] = news_count
-        
-        positive_news = len(news_df[news_df['sentiment'] == 'positive'])
-        negative_news = len(news_df[news_df['sentiment'] == 'negative'])
-        neutral_news = len(news_df[news_df['sentiment'] == 'neutral'])
-        
-        # Calculate news sentiment
-        if positive_news > negative_news and positive_news > neutral_news:
-            summary['news_sentiment'] = 'positive'
-        elif negative_news > positive_news and negative_news > neutral_news:
-            summary['news_sentiment'] = 'negative'
-        else:
-            summary['news_sentiment'] = 'neutral'
+    if has_news:
+        summary['news_count'] = len(news_df)
+        news_counts = news_df['sentiment'].value_counts()
+        summary['news_sentiment'] = dominant_sentiment(news_counts.reindex(SENTIMENT_LABELS, fill_value=0))
     
     # Calculate social media sentiment
-    if not tweets_df.empty and 'sentiment' in tweets_df.columns:
-        tweets_count = len(tweets_df)
-        summary['tweets_count'] = tweets_count
-        
-        positive_tweets = len(tweets_df[tweets_df['sentiment'] == 'positive'])
-        negative_tweets = len(tweets_df[tweets_df['sentiment'] == 'negative'])
-        neutral_tweets = len(tweets_df[tweets_df['sentiment'] == 'neutral'])
-        
-        # Calculate social sentiment
-        if positive_tweets > negative_tweets and positive_tweets > neutral_tweets:
-            summary['social_sentiment'] = 'positive'
-        elif negative_tweets > positive_tweets and negative_tweets > neutral_tweets:
-            summary['social_sentiment'] = 'negative'
-        else:
-            summary['social_sentiment'] = 'neutral'
+    if has_tweets:
+        summary['tweets_count'] = len(tweets_df)
+        tweets_counts = tweets_df['sentiment'].value_counts()
+        summary['social_sentiment'] = dominant_sentiment(tweets_counts.reindex(SENTIMENT_LABELS, fill_value=0))
     
-    # Calculate overall sentiment
+    # Calculate overall sentiment (at least one source has items here)
     total_items = summary['news_count'] + summary['tweets_count']
     
-    if total_items > 0:
-        # Combine all sentiment data
-        all_sentiments = []
-        
-        if not news_df.empty and 'sentiment' in news_df.columns:
-            all_sentiments.extend(news_df['sentiment'].tolist())
-        
-        if not tweets_df.empty and 'sentiment' in tweets_df.columns:
-            all_sentiments.extend(tweets_df['sentiment'].tolist())
-        
-        # Calculate percentages
-        positive_count = all_sentiments.count('positive')
-        negative_count = all_sentiments.count('negative')
-        neutral_count = all_sentiments.count('neutral')
-        
-        summary['positive_pct'] = (positive_count / total_items) * 100
-        summary['negative_pct'] = (negative_count / total_items) * 100
-        summary['neutral_pct'] = (neutral_count / total_items) * 100
-        
-        # Determine overall sentiment
-        if positive_count > negative_count and positive_count > neutral_count:
-            summary['overall_sentiment'] = 'positive'
-        elif negative_count > positive_count and negative_count > neutral_count:
-            summary['overall_sentiment'] = 'negative'
-        else:
-            summary['overall_sentiment'] = 'neutral'
+    # Combine the per-source counts numerically
+    total_counts = news_counts.add(tweets_counts, fill_value=0)
+    
+    # Calculate percentages
+    summary['positive_pct'] = (int(total_counts.get('positive', 0)) / total_items) * 100
+    summary['negative_pct'] = (int(total_counts.get('negative', 0)) / total_items) * 100
+    summary['neutral_pct'] = (int(total_counts.get('neutral', 0)) / total_items) * 100
+    
+    # Determine overall sentiment
+    summary['overall_sentiment'] = dominant_sentiment(total_counts.reindex(SENTIMENT_LABELS, fill_value=0))
     
     return summary
@@ -1,11 +1,38 @@
 import yfinance as yf
 import pandas as pd
+import numpy as np
 import time
+import logging
 import streamlit as st
 from datetime import datetime, timedelta
 
+# Share a persistent HTTP cache across sessions and restarts when requests_cache is installed
+try:
+    import requests_cache
+    
+    yf_session = requests_cache.CachedSession('yfinance.cache', expire_after=300)
+    yf_session.headers['User-Agent'] = 'stockdash/1.0'
+except ImportError:
+    # Logged once, when the module is first imported
+    logging.getLogger(__name__).warning(
+        "requests_cache is not installed; Yahoo Finance requests will not be cached on disk"
+    )
+    yf_session = None
+
+# The Ticker keeps its news and info after the first fetch, so it expires no later than the
+# shortest-lived cache built on it (otherwise those caches would refill from stale data)
+@st.cache_resource(ttl=300, show_spinner=False)  # Rebuild every 5 minutes
+def _ticker(ticker):
+    """Returns the shared yfinance Ticker for a symbol, using the shared HTTP session"""
+    return yf.Ticker(ticker, session=yf_session)
+
+@st.cache_data(ttl=1800, show_spinner=False)  # Cache for 30 minutes
+def _ticker_info(ticker):
+    """Fetches a ticker's info dict once for all callers (the slowest Yahoo Finance request)"""
+    return _ticker(ticker).info
+
 # Cache stock data to minimize API calls
-@st.cache_data(ttl=600)  # Cache for 10 minutes
+@st.cache_data(ttl=300, show_spinner=False)  # Cache for 5 minutes (intraday refresh cadence)
 def get_stock_data(ticker, period="1mo", interval="1d"):
     """
     Fetches stock data from Yahoo Finance API
@@ -19,7 +46,7 @@ def get_stock_data(ticker, period="1mo", interval="1d"):
     pandas.DataFrame: DataFrame with stock data
     """
     try:
-        stock = yf.Ticker(ticker)
+        stock = _ticker(ticker)
         data = stock.history(period=period, interval=interval)
         
         if data.empty:
@@ -29,8 +56,124 @@ def get_stock_data(ticker, period="1mo", interval="1d"):
     except Exception as e:
         return None, f"Error fetching data: {str(e)}"
 
+# Fetch several tickers in a single batched request
+@st.cache_data(ttl=300, show_spinner=False)  # Cache for 5 minutes (intraday refresh cadence)
+def get_stock_data_multi(tickers, period="1mo", interval="1d"):
+    """
+    Fetches stock data for multiple tickers with one Yahoo Finance request
+    
+    Parameters:
+    tickers (tuple): Stock ticker symbols
+    period (str): Time period to fetch data for (1d, 5d, 1mo, 6mo, ytd, 1y, 5y, max)
+    interval (str): Data interval (1m, 2m, 5m, 15m, 30m, 60m, 90m, 1h, 1d, 5d, 1wk, 1mo, 3mo)
+    
+    Returns:
+    dict: Mapping of ticker to DataFrame with stock data (tickers without data are omitted)
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}, None
+    
+    try:
+        data = yf.download(
+            " ".join(tickers),
+            period=period,
+            interval=interval,
+            group_by='ticker',
+            auto_adjust=True,
+            threads=True,
+            progress=False,
+            session=yf_session
+        )
+        
+        if data is None or data.empty:
+            return {}, "No data found for the requested tickers."
+        
+        # Flatten the (ticker, field) column index into one DataFrame per ticker
+        results = {}
+        for ticker in tickers:
+            if isinstance(data.columns, pd.MultiIndex):
+                if ticker not in data.columns.get_level_values(0):
+                    continue
+                ticker_data = data[ticker]
+            else:
+                ticker_data = data
+            
+            # Rows are aligned across tickers, so drop the ones this ticker has no data for
+            ticker_data = ticker_data.dropna(how='all')
+            if not ticker_data.empty:
+                results[ticker] = ticker_data
+        
+        return results, None
+    except Exception as e:
+        return {}, f"Error fetching data: {str(e)}"
+
+# Reduce long price series to a bounded number of points for charting
+def downsample_ohlc(data, max_points=1500):
+    """
+    Aggregates consecutive rows of OHLC data into buckets so that at most
+    max_points rows are sent to the chart
+    
+    Parameters:
+    data (pandas.DataFrame): DataFrame with stock data
+    max_points (int): Maximum number of rows to return
+    
+    Returns:
+    pandas.DataFrame: Downsampled DataFrame (the input is returned unchanged if already small enough)
+    """
+    if data is None or len(data) <= max_points:
+        return data
+    
+    # Each bucket keeps the first open, highest high, lowest low and last close
+    aggregations = {
+        'Open': 'first',
+        'High': 'max',
+        'Low': 'min',
+        'Close': 'last',
+        'Volume': 'sum'
+    }
+    aggregations = {col: func for col, func in aggregations.items() if col in data.columns}
+    
+    bucket_size = -(-len(data) // max_points)  # Ceiling division
+    buckets = np.arange(len(data)) // bucket_size
+    
+    downsampled = data.groupby(buckets).agg(aggregations)
+    # Label each bucket with the timestamp of its first row
+    downsampled.index = data.index[::bucket_size]
+    
+    return downsampled
+
+# Shrink stock data to the dtypes needed for charting
+def compact_chart_data(data):
+    """
+    Downcasts price/volume columns to float32 and converts the index to a
+    timezone-naive millisecond DatetimeIndex to reduce the chart payload
+    
+    Parameters:
+    data (pandas.DataFrame): DataFrame with stock data
+    
+    Returns:
+    pandas.DataFrame: Copy of the data with compact dtypes
+    """
+    if data is None or data.empty:
+        return data
+    
+    data = data.copy()
+    
+    # float32 rather than int32 for Volume, since bucketed volumes can overflow int32
+    columns = [col for col in ('Open', 'High', 'Low', 'Close', 'Volume') if col in data.columns]
+    data[columns] = data[columns].astype(np.float32)
+    
+    if isinstance(data.index, pd.DatetimeIndex):
+        index = data.index
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        data.index = index.as_unit('ms')
+    
+    return data
+
 # Get stock information
-@st.cache_data(ttl=1800)  # Cache for 30 minutes
+@st.cache_data(ttl=3600, show_spinner=False)  # Cache for 1 hour
 def get_stock_info(ticker):
     """
     Fetches stock information like company name, market cap, P/E ratio, etc.
@@ -42,8 +185,7 @@ def get_stock_info(ticker):
     dict: Dictionary containing stock information
     """
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        info = _ticker_info(ticker)
         
         # Extract relevant information
         stock_info = {
@@ -96,11 +238,12 @@ def search_stocks(query):
     list: List of matching stock tickers
     """
     try:
-        tickers = yf.Tickers(query)
+        # Split the query the way yf.Tickers does, but fetch info through the shared cache
+        symbols = query.replace(',', ' ').upper().split()
         matching_tickers = []
         
-        for ticker in tickers.tickers:
-            info = ticker.info
+        for symbol in symbols:
+            info = _ticker_info(symbol)
             if 'symbol' in info:
                 matching_tickers.append({
                     'symbol': info['symbol'],
@@ -112,6 +255,17 @@ def search_stocks(query):
     except Exception as e:
         return [], f"Error searching for stocks: {str(e)}"
 
+# Fixed-length periods; "ytd" depends on the current date and is computed on each call
+_PERIOD_TO_DELTA = {
+    "1d": timedelta(days=1),
+    "5d": timedelta(days=5),
+    "1mo": timedelta(days=30),
+    "6mo": timedelta(days=180),
+    "1y": timedelta(days=365),
+    "5y": timedelta(days=5*365),
+    "max": timedelta(days=50*365),  # Arbitrary large value
+}
+
 # Map period to time delta for date range
 def map_period_to_delta(period):
     """
@@ -123,26 +277,11 @@ def map_period_to_delta(period):
     Returns:
     datetime.timedelta: Time delta corresponding to the period
     """
-    today = datetime.now()
-    
-    if period == "1d":
-        return timedelta(days=1)
-    elif period == "5d":
-        return timedelta(days=5)
-    elif period == "1mo":
-        return timedelta(days=30)
-    elif period == "6mo":
-        return timedelta(days=180)
-    elif period == "ytd":
+    if period == "ytd":
+        today = datetime.now()
         return today - datetime(today.year, 1, 1)
-    elif period == "1y":
-        return timedelta(days=365)
-    elif period == "5y":
-        return timedelta(days=5*365)
-    elif period == "max":
-        return timedelta(days=50*365)  # Arbitrary large value
-    else:
-        return timedelta(days=30)  # Default to 1 month
+    
+    return _PERIOD_TO_DELTA.get(period, timedelta(days=30))  # Default to 1 month
 
 # Get comparable stocks
 @st.cache_data(ttl=86400)  # Cache for 24 hours
@@ -157,8 +296,7 @@ def get_comparable_stocks(ticker):
     list: List of comparable stock tickers
     """
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        info = _ticker_info(ticker)
         
         sector = info.get('sector', None)
         industry = info.get('industry', None)
@@ -168,11 +306,11 @@ def get_comparable_stocks(ticker):
         
         # For simplicity, we'll return a predefined list of stocks for each exchange
         # In a real implementation, this would be more sophisticated
-        if "NSE" in ticker or ".NS" in ticker:
+        if ticker.endswith(".NS") or ticker.startswith("^NSE"):
             return [
                 "RELIANCE.NS", "TCS.NS", "HDFCBANK.NS", "INFY.NS", "ICICIBANK.NS"
             ], None
-        elif "BSE" in ticker or ".BO" in ticker:
+        elif ticker.endswith(".BO") or ticker.startswith("^BSE"):
             return [
                 "RELIANCE.BO", "TCS.BO", "HDFCBANK.BO", "INFY.BO", "ICICIBANK.BO"
             ], None
@@ -198,7 +336,7 @@ def format_ticker(ticker, exchange=None):
     ticker = ticker.upper().strip()
     
     # Check if already formatted
-    if ".NS" in ticker or ".BO" in ticker or "^" in ticker:
+    if ticker.endswith((".NS", ".BO")) or ticker.startswith("^"):
         return ticker
     
     # Format based on exchange